@@ -2,15 +2,58 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
-import google.generativeai as genai
-from youtube_transcript_api import YouTubeTranscriptApi
+import model_registry
+from transcript import Transcript
+from transcript_cache import get_transcript
+from streaming import generate_streaming
+from transcript_compaction import compact_segments
+import metrics
 from textual.app import App, ComposeResult
-from textual.containers import Container
-from textual.widgets import Button, Input, Placeholder, Static
+from textual.containers import Container, Horizontal, Vertical, VerticalScroll
+from textual.widgets import Button, Input, LoadingIndicator, Static
+from textual.worker import get_current_worker
 
 # Load environment variables
 load_dotenv()
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+model_registry.configure(os.getenv("GOOGLE_API_KEY"))
+
+SUMMARY_PROMPT = """You are a YouTube video summarizer. You will be taking the transcript text
+        and summarizing the entire video and providing the important summary in points
+        within 250 words. Please provide the summary of the text given here:"""
+
+def extract_video_id(youtube_link):
+    """Extracts the video ID from a YouTube URL, or returns the input if it already is one"""
+    if "=" in youtube_link:
+        return youtube_link.split("=")[1].split("&")[0]
+    if "youtu.be/" in youtube_link:
+        return youtube_link.split("youtu.be/")[1].split("?")[0]
+    return youtube_link
+
+class SummaryPanel(Vertical):
+    """Shows the progress and the streamed summary of one video"""
+
+    def __init__(self, video_id: str) -> None:
+        super().__init__(classes="summary-panel")
+        self.video_id = video_id
+        self.summary = ""
+
+    def compose(self) -> ComposeResult:
+        yield Static(f"Video: {self.video_id}", classes="panel-title")
+        yield LoadingIndicator()
+        yield Static("Fetching transcript...", classes="panel-status")
+        yield Static("", classes="panel-summary")
+
+    def set_status(self, status: str) -> None:
+        self.query_one(".panel-status", Static).update(status)
+
+    def append_summary(self, text: str) -> None:
+        self.summary += text
+        self.query_one(".panel-summary", Static).update(self.summary)
+
+    def finish(self, status: str = "") -> None:
+        for indicator in self.query(LoadingIndicator):
+            indicator.remove()
+        self.set_status(status)
 
 class YouTubeSummarizerUI(App):
     """A text-based UI for the YouTube Summarizer app"""
@@ -37,51 +80,105 @@ class YouTubeSummarizerUI(App):
         ascii_lines = [ascii_str[index: index + width] for index in range(0, len(ascii_str), width)]
         return "\n".join(ascii_lines)
 
+    CSS = """
+    .summary-panel {
+        height: auto;
+        border: round $accent;
+        margin: 1 0;
+        padding: 0 1;
+    }
+    .panel-title {
+        text-style: bold;
+    }
+    LoadingIndicator {
+        height: 1;
+    }
+    """
+
     def compose(self) -> ComposeResult:
         """Define the layout of the application."""
         yield Container(
-            Input(placeholder="Enter YouTube Video Link", id="youtube_link_input"),
-            Button("Get Summary", id="summarize"),
-            Placeholder(id="summary_placeholder"),
+            Horizontal(
+                Input(placeholder="Enter YouTube Video Link", id="youtube_link_input"),
+                Button("Get Summary", id="summarize"),
+                id="controls",
+            ),
+            VerticalScroll(id="summary_panels"),
         )
 
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle the click event for the 'Get Summary' button"""
         if event.button.id == "summarize":
-            youtube_link = self.query_one("#youtube_link_input", Input).value
-            video_id = youtube_link.split("=")[1]
-            transcript_text = await self.extract_transcript_details(video_id)
-
-            # Generate the summary without printing the transcript
-            summary = await self.generate_gemini_content(transcript_text)
-            
-            # Replace the placeholder with the summary
-            summary_placeholder = self.query_one("#summary_placeholder", Placeholder)
-            summary_placeholder.parent.mount(Static(summary), before=summary_placeholder)
-            summary_placeholder.remove()
-
-    async def extract_transcript_details(self, video_id: str) -> str:
+            await self.start_summary(self.query_one("#youtube_link_input", Input).value)
+
+    async def on_input_submitted(self, event: Input.Submitted) -> None:
+        """Pressing Enter in the link input starts a summary as well"""
+        await self.start_summary(event.value)
+
+    async def start_summary(self, youtube_link: str) -> None:
+        """Open a panel for the video and summarize it on a background worker.
+
+        Each video gets its own panel and worker, so several summaries can run
+        at once. Submitting a link that is already being summarized cancels the
+        earlier run and starts over in the same panel.
+        """
+        youtube_link = youtube_link.strip()
+        if not youtube_link:
+            return
+        video_id = extract_video_id(youtube_link)
+
+        for panel in self.query(SummaryPanel):
+            if panel.video_id == video_id:
+                await panel.remove()
+        panel = SummaryPanel(video_id)
+        await self.query_one("#summary_panels", VerticalScroll).mount(panel, before=0)
+        self.query_one("#youtube_link_input", Input).value = ""
+
+        # exclusive=True cancels any earlier worker in the same group (the same video)
+        self.run_worker(lambda: self.summarize_video(panel), thread=True,
+                        group=f"video-{video_id}", exclusive=True)
+
+    def summarize_video(self, panel: SummaryPanel) -> None:
+        """Fetch the transcript and stream its summary into the panel (runs in a worker thread)"""
+        worker = get_current_worker()
+        try:
+            transcript_text = self.extract_transcript_details(panel.video_id)
+            if worker.is_cancelled:
+                return
+            self.call_from_thread(panel.set_status, "Generating summary...")
+
+            def on_chunk(text):
+                if not worker.is_cancelled:
+                    self.call_from_thread(panel.append_summary, text)
+
+            self.generate_gemini_content(transcript_text, on_chunk)
+            if not worker.is_cancelled:
+                self.call_from_thread(panel.finish)
+        except Exception as e:
+            if not worker.is_cancelled:
+                self.call_from_thread(panel.finish, f"Error: {e}")
+
+    def extract_transcript_details(self, video_id: str) -> str:
         """Extract the transcript text from a YouTube video without displaying it"""
         try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
-            return " ".join(item["text"] for item in transcript)
+            with metrics.span("fetch_transcript", request_id=video_id, frontend="tui"):
+                transcript = get_transcript(video_id)
+            with metrics.span("compact_transcript", request_id=video_id, frontend="tui"):
+                transcript, _ = compact_segments(transcript)
         except Exception as e:
-            return f"Error retrieving transcript: {e}"
-        
-    async def generate_gemini_content(self, transcript_text: str) -> str:
-        """Generate a summary using the Gemini Pro model"""
-        prompt = """You are a YouTube video summarizer. You will be taking the transcript text
-        and summarizing the entire video and providing the important summary in points
-        within 250 words. Please provide the summary of the text given here:"""
-        
-        model = genai.GenerativeModel("gemini-pro")
-        
+            raise RuntimeError(f"Error retrieving transcript: {e}") from e
+        return Transcript.from_segments(transcript).text
+
+    def generate_gemini_content(self, transcript_text: str, on_chunk=None) -> str:
+        """Generate a summary using the Gemini Pro model, passing each chunk to on_chunk as it arrives"""
+        model = model_registry.get_model("gemini-pro")
+
         try:
-            response = model.generate_content(prompt + transcript_text)
-            summary = "\n".join(part.text for part in response.candidates[0].content.parts)
+            with metrics.span("generate", frontend="tui", kind="summary"):
+                summary, _ = generate_streaming(model, SUMMARY_PROMPT + transcript_text, on_chunk)
             return summary
         except Exception as e:
-            return f"Error generating summary: {e}"
+            raise RuntimeError(f"Error generating summary: {e}") from e
 
 if __name__ == "__main__":
     YouTubeSummarizerUI().run()
@@ -0,0 +1,346 @@
+"""Asyncio HTTP API for summarizing and answering questions about YouTube videos.
+
+Runs the same pipeline as the CLI (``get_youtube_transcript``,
+``summarize_text`` and ``ask_question`` from ``gemini_1_5_cli.py``) behind a
+small HTTP/1.1 server with no dependencies beyond the standard library:
+
+    POST /summarize  {"video": URL or ID, "word_count": 250, "stream": false, "compact": true}
+    POST /ask        {"video": URL or ID, "question": "...", "stream": false, "compact": true}
+                     or {"video": ..., "questions": ["...", ...]} to answer several in one Gemini call
+    GET  /healthz    queue depth and worker count
+    GET  /metrics    per-stage timings in Prometheus text format
+
+Requests wait in a bounded queue for one of a fixed pool of workers; when the
+queue is full the server answers 429 with Retry-After instead of piling up
+work, and a request that has not finished within the timeout gets 504. A
+Gemini call cannot be interrupted, so a worker stays busy with a timed-out
+job until it really finishes; ``/healthz`` reports those as ``abandoned``.
+Clients that do not send their whole request within ``API_READ_TIMEOUT``
+seconds get 408.
+With ``"stream": true`` the response is newline-delimited JSON: one
+``{"chunk": ...}`` line per generated piece of text, then the final result.
+
+Example:
+    API_PORT=8080 API_WORKERS=8 python api_server.py
+"""
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gemini_1_5_cli as cli
+import metrics
+
+HOST = os.getenv("API_HOST", "127.0.0.1")
+PORT = int(os.getenv("API_PORT", 8080))
+WORKERS = int(os.getenv("API_WORKERS", 4))
+QUEUE_SIZE = int(os.getenv("API_QUEUE_SIZE", 32))
+REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", 120))
+# Time a client gets to send its request line, headers and body
+READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", 30))
+MAX_BODY_BYTES = 64 * 1024
+MAX_WORD_COUNT = 5000
+SUMMARY_PROMPT = "Summarize the following YouTube video transcript in about {word_count} words. Provide the key points and main takeaways: "
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 408: "Request Timeout",
+           413: "Payload Too Large",
+           422: "Unprocessable Entity", 429: "Too Many Requests", 500: "Internal Server Error",
+           502: "Bad Gateway", 504: "Gateway Timeout"}
+
+
+class APIError(Exception):
+    """Error answered with an HTTP status and a JSON ``{"error": message}`` body."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Request validation, run on the event loop before a job is queued
+
+def validate_request(request):
+    """Checks the fields shared by every endpoint; raises APIError(400) for a malformed request."""
+    if not isinstance(request, dict) or not request.get("video"):
+        raise APIError(400, "Missing 'video'.")
+    if not isinstance(request["video"], str):
+        raise APIError(400, "'video' must be a string.")
+    for name in ("stream", "compact"):
+        if name in request and not isinstance(request[name], bool):
+            raise APIError(400, f"'{name}' must be true or false.")
+
+
+def validate_summarize(request):
+    validate_request(request)
+    word_count = request.get("word_count", 250)
+    # bool is an int subclass; reject it along with strings and floats
+    if isinstance(word_count, bool) or not isinstance(word_count, int) or not 1 <= word_count <= MAX_WORD_COUNT:
+        raise APIError(400, f"'word_count' must be an integer from 1 to {MAX_WORD_COUNT}.")
+
+
+def validate_ask(request):
+    validate_request(request)
+    question, questions = request.get("question"), request.get("questions")
+    if not question and not questions:
+        raise APIError(400, "Missing 'question'.")
+    if question and not isinstance(question, str):
+        raise APIError(400, "'question' must be a string.")
+    if questions is not None and not (isinstance(questions, list) and all(isinstance(q, str) for q in questions)):
+        raise APIError(400, "'questions' must be a list of strings.")
+
+
+# Pipeline steps, run on worker threads
+
+def summarize(request, on_chunk=None):
+    video_id = cli.extract_video_id(request["video"])
+    transcript = cli.get_youtube_transcript(video_id, request.get("compact", True))
+    if not transcript:
+        raise APIError(422, "Failed to fetch transcript.")
+    prompt_prefix = SUMMARY_PROMPT.format(word_count=request.get("word_count", 250))
+    summary = cli.summarize_text(transcript, prompt_prefix, on_chunk=on_chunk)
+    if summary is None:
+        raise APIError(502, "Failed to generate summary.")
+    return {"video_id": video_id, "summary": summary}
+
+
+def ask(request, on_chunk=None):
+    questions = request.get("questions")
+    video_id = cli.extract_video_id(request["video"])
+    transcript = cli.get_youtube_transcript(video_id, request.get("compact", True))
+    if not transcript:
+        raise APIError(422, "Failed to fetch transcript.")
+    if questions:
+        answers = cli.ask_questions(transcript, questions, video_id, compact=request.get("compact", True))
+        if answers is None:
+            raise APIError(502, "Failed to generate answers.")
+        return {"video_id": video_id,
+                "answers": [{"question": question, "answer": answer} for question, answer in zip(questions, answers)]}
+    answer = cli.ask_question(transcript, request["question"], video_id, on_chunk=on_chunk,
+                              compact=request.get("compact", True))
+    if answer is None:
+        raise APIError(502, "Failed to generate an answer.")
+    return {"video_id": video_id, "question": request["question"], "answer": answer}
+
+
+# path -> (validator, handler)
+ROUTES = {"/summarize": (validate_summarize, summarize), "/ask": (validate_ask, ask)}
+
+
+class _Job:
+    def __init__(self, handler, request, deadline, stream):
+        self.handler = handler
+        self.request = request
+        self.deadline = deadline
+        self.result = asyncio.get_running_loop().create_future()
+        self.started = False
+        # Generated chunks for streaming responses; None marks the end
+        self.chunks = asyncio.Queue() if stream else None
+
+
+class APIServer:
+    """Bounded job queue served by a fixed pool of worker threads."""
+
+    def __init__(self, workers=WORKERS, queue_size=QUEUE_SIZE, timeout=REQUEST_TIMEOUT):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.rejected = 0
+        self.running = 0  # jobs whose worker thread is executing
+        self.abandoned = 0  # of those, jobs whose client already got a 504
+
+    async def serve(self, host=HOST, port=PORT):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="api-worker")
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        print(f"Serving on http://{host}:{port} ({self.workers} workers, queue of {self.queue_size})", file=sys.stderr)
+        async with server:
+            await stop.wait()
+        # Stop accepting connections, then let accepted requests finish
+        try:
+            await asyncio.wait_for(self.queue.join(), self.timeout)
+        except asyncio.TimeoutError:
+            pass
+        for worker in workers:
+            worker.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.result.done() or loop.time() >= job.deadline:
+                    continue  # The client already got a 504 (or went away) while this waited in the queue
+                on_chunk = None
+                if job.chunks is not None:
+                    on_chunk = lambda text, chunks=job.chunks: loop.call_soon_threadsafe(chunks.put_nowait, text)
+                self.running += 1
+                job.started = True
+                try:
+                    # Returns only once the thread is done: the worker (and its slot) stays taken until then
+                    result = await loop.run_in_executor(self.executor, job.handler, job.request, on_chunk)
+                except Exception as e:
+                    if not job.result.done():
+                        job.result.set_exception(e)
+                else:
+                    if not job.result.done():
+                        job.result.set_result(result)
+                finally:
+                    self.running -= 1
+                    if job.result.cancelled():
+                        self.abandoned -= 1
+            finally:
+                if job.chunks is not None:
+                    job.chunks.put_nowait(None)
+                self.queue.task_done()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            try:
+                try:
+                    method, path, body = await asyncio.wait_for(self._read_request(reader), READ_TIMEOUT)
+                except asyncio.TimeoutError:
+                    raise APIError(408, f"Request not received within {READ_TIMEOUT:g}s.")
+                await self._route(method, path, body, writer)
+            except APIError as e:
+                await self._send_json(writer, e.status, {"error": str(e)},
+                                      {"Retry-After": "1"} if e.status == 429 else None)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass
+            except Exception as e:
+                await self._send_json(writer, 500, {"error": f"Internal error: {e}"})
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise APIError(400, "Malformed request line.")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise APIError(400, "Invalid Content-Length.")
+        if length > MAX_BODY_BYTES:
+            raise APIError(413, "Request body too large.")
+        body = await reader.readexactly(length) if length else b""
+        return method, target.split("?", 1)[0], body
+
+    async def _route(self, method, path, body, writer):
+        if path == "/healthz" and method == "GET":
+            await self._send_json(writer, 200, {"status": "ok", "queued": self.queue.qsize(),
+                                                "queue_size": self.queue_size, "workers": self.workers,
+                                                "running": self.running, "abandoned": self.abandoned,
+                                                "rejected": self.rejected})
+            return
+        if path == "/metrics" and method == "GET":
+            await self._send(writer, 200, metrics.metrics.to_prometheus().encode("utf-8"),
+                             "text/plain; version=0.0.4")
+            return
+        route = ROUTES.get(path)
+        if route is None:
+            raise APIError(404, f"No such endpoint: {path}")
+        if method != "POST":
+            raise APIError(405, "Use POST.")
+
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise APIError(400, "Body must be JSON.")
+        # Malformed requests are answered here, without taking a queue slot or a worker
+        validate, handler = route
+        validate(request)
+
+        loop = asyncio.get_running_loop()
+        stream = request.get("stream", False)
+        job = _Job(handler, request, loop.time() + self.timeout, stream)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise APIError(429, "Server is busy; retry later.")
+
+        if stream:
+            await self._stream(job, writer)
+            return
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job.result), self.timeout)
+        except asyncio.TimeoutError:
+            self._abandon(job)
+            raise APIError(504, f"Request did not finish within {self.timeout:g}s.")
+        await self._send_json(writer, 200, result)
+
+    def _abandon(self, job):
+        """Gives up on a timed-out job; one already running keeps its worker until its thread finishes."""
+        if job.result.cancel() and job.started:
+            self.abandoned += 1
+
+    async def _stream(self, job, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\n")
+
+        async def send_line(data):
+            line = (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+            writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+            await writer.drain()
+
+        loop = asyncio.get_running_loop()
+        while True:
+            remaining = job.deadline - loop.time()
+            try:
+                text = await asyncio.wait_for(job.chunks.get(), max(remaining, 0))
+            except asyncio.TimeoutError:
+                self._abandon(job)
+                await send_line({"error": "Request timed out.", "status": 504})
+                break
+            if text is None:
+                try:
+                    await send_line(job.result.result())
+                except APIError as e:
+                    await send_line({"error": str(e), "status": e.status})
+                except Exception as e:
+                    await send_line({"error": f"Internal error: {e}", "status": 500})
+                break
+            await send_line({"chunk": text})
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _send_json(self, writer, status, data, headers=None):
+        await self._send(writer, status, json.dumps(data, ensure_ascii=False).encode("utf-8"),
+                         "application/json", headers)
+
+    async def _send(self, writer, status, body, content_type, headers=None):
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                 f"Content-Length: {len(body)}", "Connection: close"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+def main():
+    started = time.perf_counter()
+    # Load the client libraries before accepting traffic so the first request is warm
+    cli.get_model('gemini-1.5-pro')
+    print(f"Gemini client ready in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    asyncio.run(APIServer().serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,26 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
-import google.generativeai as genai
-from youtube_transcript_api import YouTubeTranscriptApi, _errors
+from youtube_transcript_api import _errors
+import model_registry
+from transcript import Transcript
+from transcript_cache import get_transcript
+from result_cache import create_result_cache, make_key
+from chunked_summary import (LONG_TRANSCRIPT_TOKENS, estimate_tokens, join_chunk_summaries,
+                             segments_from_text, split_segments, summarize_chunks)
+from transcript_index import TranscriptIndex, format_context
+from streaming import generate_streaming
+from transcript_compaction import compact_segments, format_stats
+from single_flight import SingleFlight
+from context_cache import ContextUnavailable, create_context_cache
+from playlist import is_collection_url
+import multi_question
+import json
+from prefetch import Prefetcher
+from summary_hierarchy import SummaryHierarchy
+from transcript_store import TranscriptStore
+from rate_limiter import get_rate_limiter
+import metrics
 
 # Must be the first Streamlit command
 st.set_page_config(
@@ -11,42 +29,155 @@ st.set_page_config(
     page_icon="📺"
 )
 
-# Load environment variables for local development
-load_dotenv()
+# Resolve and configure the Google Gemini API key once per process rather than on every rerun
+# Supports both local env and Streamlit secrets
+@st.cache_resource
+def configure_gemini():
+    # Load environment variables for local development
+    load_dotenv()
+    api_key = os.getenv("GOOGLE_API_KEY")
+    source = "Environment Variable"
 
-# Configure Google Gemini API - Support both local env and Streamlit secrets
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        # Fall back to Streamlit secrets (for cloud deployment)
+        try:
+            api_key = st.secrets["GOOGLE_API_KEY"]
+            source = "Streamlit Secrets"
+        except Exception:
+            return None
 
-if GOOGLE_API_KEY:
-    # Use environment variable if available (for local development)
-    genai.configure(api_key=GOOGLE_API_KEY)
-    st.sidebar.success("Using Environment Variable for API key")
+    model_registry.configure(api_key)
+    return source
+
+api_key_source = configure_gemini()
+if api_key_source:
+    st.sidebar.success(f"Using {api_key_source} for API key")
 else:
-    # Fall back to Streamlit secrets (for cloud deployment)
-    try:
-        genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
-        st.sidebar.success("Using Streamlit Secrets for API key")
-    except Exception:
-        st.error("Google API Key not found. Please set it in .streamlit/secrets.toml or as an environment variable.")
-        st.stop()
+    configure_gemini.clear()  # Retry on the next rerun once the key has been set
+    st.error("Google API Key not found. Please set it in .streamlit/secrets.toml or as an environment variable.")
+    st.stop()
+
+MODEL_NAME = 'gemini-1.5-pro'  # Using Gemini 1.5 Pro
+SUMMARY_PROMPT = "Summarize the following YouTube video transcript in about {word_count} words. Provide the key points and main takeaways: {text}"
+REDUCE_PROMPT = "The following are summaries of consecutive parts of one YouTube video transcript. Combine them into a single summary of the whole video in about {word_count} words. Provide the key points and main takeaways:\n\n{summaries}"
+QUESTION_PROMPT = "Use the following YouTube video transcript to answer this question: {question}\n\nTranscript: {transcript_text}"
+CACHED_QUESTION_PROMPT = "Answer this question about the video: {question}"
+RETRIEVAL_QUESTION_PROMPT = "Use the following excerpts from a YouTube video transcript to answer this question: {question}\nCite the [m:ss] timestamps of the excerpts you rely on.\n\nExcerpts:\n{context}"
+
+# Shared across all sessions so identical requests skip the API call
+@st.cache_resource
+def get_result_cache():
+    return create_result_cache()
+
+# Concurrent identical requests from different sessions share one in-progress computation
+@st.cache_resource
+def get_single_flight():
+    return SingleFlight()
+
+# One copy of each transcript and summary for the whole process; sessions hold only refs to them
+@st.cache_resource
+def get_transcript_store():
+    return TranscriptStore()
+
+# Shorter summaries of a video are condensed from a longer one already generated
+@st.cache_resource
+def get_summary_hierarchy():
+    return SummaryHierarchy(get_result_cache(), MODEL_NAME)
+
+# Transcripts uploaded once as Gemini cached content, shared across sessions
+@st.cache_resource
+def get_context_cache():
+    return create_context_cache()
+
+# Speculative transcript and summary work started on URL entry, shared across sessions
+@st.cache_resource
+def get_prefetcher():
+    return Prefetcher()
+
+# Built once per video and kept in the shared store, under its memory cap; questions send only the relevant chunks
+def get_transcript_index(video_id, compact=True):
+    return get_transcript_store().get(("index", video_id, compact),
+                                      lambda: TranscriptIndex.from_segments(load_transcript(video_id, compact)))
+
+# Serves /metrics (Prometheus) and /metrics.json when METRICS_PORT is set
+@st.cache_resource
+def start_metrics_server():
+    port = os.getenv("METRICS_PORT")
+    return metrics.start_http_server(int(port)) if port else None
+
+start_metrics_server()
+
+# Generates text within the API key's rate limits, retrying throttled calls.
+# Streams chunks to on_chunk when given and records time-to-first-token.
+def generate_text(model, prompt, on_chunk=None):
+    limiter = get_rate_limiter(model_registry.configured_api_key())
+    prompt_tokens = estimate_tokens(prompt)
+    with metrics.span("generate", frontend="app") as span:
+        span.record(prompt_bytes=len(prompt.encode("utf-8")), prompt_tokens=prompt_tokens)
+        if on_chunk is None:
+            text = limiter.call(lambda: model.generate_content(prompt).text, prompt_tokens)
+        else:
+            text, stats = limiter.call(lambda: generate_streaming(model, prompt, on_chunk), prompt_tokens)
+            st.session_state['time_to_first_token'] = stats['time_to_first_token']
+        span.record(output_bytes=len(text.encode("utf-8")))
+    return text
+
+# Returns an on_chunk callback that renders the text so far into a placeholder
+def stream_into(placeholder):
+    parts = []
+    def on_chunk(text):
+        parts.append(text)
+        placeholder.markdown("".join(parts) + "▌")
+    return on_chunk
+
+# Rebuilds a transcript evicted from the shared store, from the on-disk transcript cache
+def load_transcript(video_id, compact=True):
+    segments = get_transcript(video_id)
+    if compact:
+        segments, _ = compact_segments(segments)
+    return Transcript.from_segments(segments)
+
+# Points a session state entry at a shared store entry, releasing the one it held before
+def hold(name, ref):
+    previous = st.session_state[name]
+    st.session_state[name] = ref
+    if previous is not None:
+        previous.release()
 
 # Function to get YouTube video ID
 def get_video_id(youtube_video_url):
+    if is_collection_url(youtube_video_url):
+        raise ValueError("Playlist and channel URLs are not supported here; use the CLI batch mode to summarize every video")
     if "=" in youtube_video_url:
-        return youtube_video_url.split("=")[1]
+        # Drop any further parameters such as &list=... or &t=...
+        return youtube_video_url.split("=")[1].split("&")[0]
     elif "youtu.be" in youtube_video_url:
         return youtube_video_url.split("/")[-1]
     else:
         raise ValueError("Invalid YouTube URL format")
 
 # Function to get YouTube transcript
-def extract_transcript_details(youtube_video_url):
+def extract_transcript_details(youtube_video_url, compact=True):
     try:
-        video_id = get_video_id(youtube_video_url)
-        transcript_text = YouTubeTranscriptApi.get_transcript(video_id)
+        with metrics.span("parse_url", frontend="app"):
+            video_id = get_video_id(youtube_video_url)
+        with metrics.span("fetch_transcript", request_id=video_id, frontend="app") as span:
+            transcript_text = get_single_flight().do(("transcript", video_id), lambda: get_transcript(video_id))
+            span.record(segments=len(transcript_text))
+        st.session_state['compaction_stats'] = None
+        if compact:
+            # Drop caption noise, fillers and repeated lines before any prompt is built
+            with metrics.span("compact_transcript", request_id=video_id, frontend="app"):
+                transcript_text, st.session_state['compaction_stats'] = compact_segments(transcript_text)
 
-        transcript = " ".join([entry['text'] for entry in transcript_text])
-        return transcript, video_id
+        with metrics.span("join_transcript", request_id=video_id, frontend="app") as span:
+            # Keeps segment timings alongside the joined text for map-reduce chunking
+            transcript = Transcript.from_segments(transcript_text)
+            span.record(bytes=len(transcript.text.encode("utf-8")))
+        # Sessions on the same video share one stored copy
+        hold('transcript_ref', get_transcript_store().ref(("transcript", video_id, compact),
+                                                          lambda: load_transcript(video_id, compact), transcript))
+        return transcript.text, video_id
     
     except _errors.TranscriptsDisabled:
         st.error("Transcripts are disabled for this video.")
@@ -56,30 +187,121 @@ def extract_transcript_details(youtube_video_url):
         return None, None
 
 # Function to summarize text using Gemini 1.5 Pro
-def summarize_text(text, word_count=250):
-    prompt = f"Summarize the following YouTube video transcript in about {word_count} words. Provide the key points and main takeaways: {text}"
-    
-    model = genai.GenerativeModel('gemini-1.5-pro')  # Using Gemini 1.5 Pro
-    
-    try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        st.error(f"Error generating summary: {e}")
-        return None
+def summarize_text(text, word_count=250, bypass_cache=False, on_chunk=None, transcript=None):
+    model = model_registry.get_model(MODEL_NAME)
+
+    # Summarizes the whole transcript in about words words
+    def summarize_full(words):
+        with metrics.span("build_prompt", frontend="app", kind="summary"):
+            prompt = SUMMARY_PROMPT.format(word_count=words, text=text)
+
+        # Long transcripts are summarized in parallel chunks, then combined
+        if estimate_tokens(text) > LONG_TRANSCRIPT_TOKENS:
+            chunks = split_segments(transcript if transcript is not None else segments_from_text(text))
+            partials = summarize_chunks(chunks, lambda chunk_prompt: generate_text(model, chunk_prompt),
+                                        cache=get_result_cache(), model_name=MODEL_NAME, bypass_cache=bypass_cache)
+            prompt = REDUCE_PROMPT.format(word_count=words, summaries=join_chunk_summaries(chunks, partials))
+
+        # A longer base summary that is condensed afterwards is not what the user sees, so it is not streamed
+        return generate_text(model, prompt, on_chunk if words == word_count else None)
+
+    def generate():
+        try:
+            return get_summary_hierarchy().summarize(text, word_count, summarize_full,
+                                                     lambda prompt: generate_text(model, prompt, on_chunk),
+                                                     bypass=bypass_cache)
+        except Exception as e:
+            st.error(f"Error generating summary: {e}")
+            return None
+
+    key = make_key(text, MODEL_NAME, SUMMARY_PROMPT, word_count=word_count)
+    return get_single_flight().do(("summary", key, bypass_cache),
+                                  lambda: get_result_cache().get_or_compute(key, generate, bypass=bypass_cache))
 
 # Function to answer questions based on the transcript
-def answer_question(transcript_text, question):
-    prompt = f"Use the following YouTube video transcript to answer this question: {question}\n\nTranscript: {transcript_text}"
-    
-    model = genai.GenerativeModel('gemini-1.5-pro')  # Using Gemini 1.5 Pro
-    
-    try:
-        response = model.generate_content(prompt)
-        return response.text
-    except Exception as e:
-        st.error(f"Error answering question: {e}")
-        return None
+def answer_question(transcript_text, question, bypass_cache=False, video_id=None, on_chunk=None, compact=True,
+                    use_context_cache=False):
+    # Each answer is cached under the prompt that actually produced it
+    def cached(context, template, generate):
+        key = make_key(context, MODEL_NAME, template, question=question)
+        return get_single_flight().do(("answer", key, bypass_cache),
+                                      lambda: get_result_cache().get_or_compute(key, generate, bypass=bypass_cache))
+
+    def generate_with(model, prompt, cached_model=False):
+        try:
+            return generate_text(model, prompt, on_chunk)
+        except Exception as e:
+            if cached_model:
+                # The cached content may have expired early; recreate it on the next question
+                get_context_cache().invalidate(MODEL_NAME, transcript_text)
+            st.error(f"Error answering question: {e}")
+            return None
+
+    # Follow-up questions then send only the question; short transcripts are never cached
+    if use_context_cache and get_context_cache().eligible(transcript_text):
+        def generate_cached():
+            # Only on a result-cache miss: creating the cached context uploads the whole transcript
+            with metrics.span("cache_context", request_id=video_id, frontend="app"):
+                cached_model = get_context_cache().get_model(MODEL_NAME, transcript_text)
+            if cached_model is None:
+                raise ContextUnavailable()
+            return generate_with(cached_model, CACHED_QUESTION_PROMPT.format(question=question), cached_model=True)
+
+        try:
+            return cached(transcript_text, CACHED_QUESTION_PROMPT, generate_cached)
+        except ContextUnavailable:
+            pass  # The cache could not be created: answer with the regular prompt below
+
+    with metrics.span("build_prompt", request_id=video_id, frontend="app", kind="answer"):
+        if video_id:
+            context = format_context(get_transcript_index(video_id, compact).search(question))
+            template = RETRIEVAL_QUESTION_PROMPT
+            prompt = RETRIEVAL_QUESTION_PROMPT.format(question=question, context=context)
+        else:
+            context = transcript_text
+            template = QUESTION_PROMPT
+            prompt = QUESTION_PROMPT.format(question=question, transcript_text=transcript_text)
+    return cached(context, template, lambda: generate_with(model_registry.get_model(MODEL_NAME), prompt))
+
+# Function to answer a list of questions in one Gemini call; returns the answers in order
+def answer_questions(transcript_text, questions, bypass_cache=False, video_id=None, compact=True):
+    with metrics.span("build_prompt", request_id=video_id, frontend="app", kind="answers"):
+        if video_id:
+            # One set of excerpts covering every question, sent once
+            context = format_context(get_transcript_index(video_id, compact).search_many(questions))
+        else:
+            context = transcript_text
+
+    def generate():
+        model = model_registry.get_model(MODEL_NAME, multi_question.JSON_GENERATION_CONFIG)
+
+        try:
+            answers = multi_question.answer_questions(
+                questions, context, lambda prompt: generate_text(model, prompt),
+                lambda question: answer_question(transcript_text, question, bypass_cache, video_id, compact=compact))
+        except Exception as e:
+            st.error(f"Error answering questions: {e}")
+            return None
+        # Cached as JSON so the disk result cache can store it; an empty answer is still an answer
+        return json.dumps(answers) if all(answer is not None for answer in answers) else None
+
+    key = make_key(context, MODEL_NAME, multi_question.MULTI_QUESTION_PROMPT, questions=questions)
+    answers = get_single_flight().do(("answers", key, bypass_cache),
+                                     lambda: get_result_cache().get_or_compute(key, generate, bypass=bypass_cache))
+    return json.loads(answers) if answers else None
+
+# Runs on a prefetch worker: warms the transcript cache and, optionally, the summary,
+# through the same single-flight keys the "Generate Summary" click uses
+def prefetch_video(video_id, compact, word_count, summarize, cancelled):
+    with metrics.span("prefetch", request_id=video_id, frontend="app", kind="transcript"):
+        segments = get_single_flight().do(("transcript", video_id), lambda: get_transcript(video_id))
+    if not summarize or cancelled.is_set():
+        return
+    if compact:
+        segments, _ = compact_segments(segments)
+    transcript = Transcript.from_segments(segments)
+    with metrics.span("prefetch", request_id=video_id, frontend="app", kind="summary"):
+        summarize_text(transcript.text, word_count, transcript=transcript)
 
 # Custom CSS
 st.markdown("""
@@ -108,12 +330,21 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session states
-if 'transcript_text' not in st.session_state:
-    st.session_state['transcript_text'] = ""
-if 'summary' not in st.session_state:
-    st.session_state['summary'] = ""
+# Transcript and summary live in the shared store; the session keeps refs to them
+if 'transcript_ref' not in st.session_state:
+    st.session_state['transcript_ref'] = None
+if 'summary_ref' not in st.session_state:
+    st.session_state['summary_ref'] = None
 if 'video_id' not in st.session_state:
     st.session_state['video_id'] = ""
+if 'time_to_first_token' not in st.session_state:
+    st.session_state['time_to_first_token'] = None
+if 'summary_time_to_first_token' not in st.session_state:
+    st.session_state['summary_time_to_first_token'] = None
+if 'compaction_stats' not in st.session_state:
+    st.session_state['compaction_stats'] = None
+if 'prefetch' not in st.session_state:
+    st.session_state['prefetch'] = None
 
 # App header
 st.markdown('<p class="main-header">YouTube Video Summarizer</p>', unsafe_allow_html=True)
@@ -123,6 +354,26 @@ st.markdown('<p class="subheader">Powered by Gemini 1.5 Pro</p>', unsafe_allow_h
 st.sidebar.header("Video Settings")
 video_width_percentage = st.sidebar.slider("Video Width (%)", min_value=10, max_value=100, value=80)
 word_count = st.sidebar.number_input("Summary Word Count", min_value=50, max_value=1000, value=250, step=50)
+compact_transcript = st.sidebar.checkbox("Compact transcript", value=True, help="Remove caption noise such as [Music], filler words and repeated lines before sending the transcript to Gemini")
+stream_responses = st.sidebar.checkbox("Stream responses", value=True, help="Show generated text as it arrives")
+bypass_cache = st.sidebar.checkbox("Bypass result cache", value=False, help="Always call Gemini, even for a summary or answer generated before")
+prefetch_summary = st.sidebar.checkbox("Prefetch summary", value=False, help="Start summarizing as soon as a link is entered, before the button is clicked. Uses a Gemini call even if you never click")
+use_context_cache = st.sidebar.checkbox("Cache transcript context", value=False, help="Upload long transcripts to Gemini once so follow-up questions send only the question")
+cache_stats = get_result_cache().stats()
+st.sidebar.caption(f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+hierarchy_stats = get_summary_hierarchy().stats()
+if hierarchy_stats['derived']:
+    st.sidebar.caption(f"Summaries condensed from a longer one: {hierarchy_stats['derived']} of {hierarchy_stats['derived'] + hierarchy_stats['full']}")
+flight_stats = get_single_flight().stats()
+st.sidebar.caption(f"Coalesced requests: {flight_stats['coalesced']} of {flight_stats['executed'] + flight_stats['coalesced']}")
+context_stats = get_context_cache().stats()
+if context_stats['created']:
+    st.sidebar.caption(f"Cached contexts: {context_stats['created']} created, {context_stats['reused']} reused (~{context_stats['cached_tokens']:,} input tokens from cache)")
+store_stats = get_transcript_store().stats()
+st.sidebar.caption(f"Shared transcripts and indexes: {store_stats['entries']} entries, {store_stats['bytes'] / 2**20:.1f} of {store_stats['max_bytes'] / 2**20:.0f} MB, {store_stats['refs']} session refs")
+prefetch_stats = get_prefetcher().stats()
+if prefetch_stats['started']:
+    st.sidebar.caption(f"Prefetches: {prefetch_stats['started']} started, {prefetch_stats['cancelled']} cancelled")
 st.sidebar.markdown("---")
 st.sidebar.markdown("### About")
 st.sidebar.info("This app uses Google's Gemini 1.5 Pro model to summarize YouTube videos and answer questions about the content.")
@@ -130,18 +381,47 @@ st.sidebar.info("This app uses Google's Gemini 1.5 Pro model to summarize YouTub
 # Main input
 youtube_link = st.text_input("Enter YouTube Video Link:", placeholder="https://www.youtube.com/watch?v=...")
 
+# Start on the transcript (and optionally the summary) as soon as a valid link is entered,
+# so the click below finds the work cached or joins it in flight
+prefetch_key = None
+if youtube_link:
+    try:
+        # A fresh generation was asked for, so a speculative summary would be wasted
+        speculate = prefetch_summary and not bypass_cache
+        prefetch_key = (get_video_id(youtube_link), compact_transcript, word_count if speculate else None, speculate)
+    except ValueError:
+        pass
+if st.session_state['prefetch'] is not None and st.session_state['prefetch'].key != prefetch_key:
+    # The link or the settings changed; discard the stale work
+    get_prefetcher().cancel(st.session_state['prefetch'])
+    st.session_state['prefetch'] = None
+if prefetch_key is not None and st.session_state['prefetch'] is None:
+    st.session_state['prefetch'] = get_prefetcher().submit(
+        prefetch_key, lambda cancelled, key=prefetch_key: prefetch_video(*key, cancelled))
+
 if st.button("Generate Summary"):
     with st.spinner("Processing video transcript..."):
-        transcript, video_id = extract_transcript_details(youtube_link)
+        transcript, video_id = extract_transcript_details(youtube_link, compact_transcript)
         
         if transcript and video_id:
-            st.session_state['transcript_text'] = transcript
             st.session_state['video_id'] = video_id
+            transcript_ref = st.session_state['transcript_ref']
             
             with st.spinner("Generating summary with Gemini 1.5 Pro..."):
-                summary = summarize_text(transcript, word_count)
+                st.session_state['time_to_first_token'] = None
+                summary_placeholder = st.empty()
+                summary = summarize_text(transcript, word_count, bypass_cache,
+                                         on_chunk=stream_into(summary_placeholder) if stream_responses else None,
+                                         transcript=transcript_ref.get())
+                # The streamed preview is replaced by the regular summary section below
+                summary_placeholder.empty()
+                st.session_state['summary_time_to_first_token'] = st.session_state['time_to_first_token']
                 if summary:
-                    st.session_state['summary'] = summary
+                    # An evicted summary is recomputed, normally from the result cache
+                    hold('summary_ref', get_transcript_store().ref(
+                        ("summary", video_id, compact_transcript, word_count),
+                        lambda: summarize_text(transcript_ref.get().text, word_count, transcript=transcript_ref.get()),
+                        summary, replace=bypass_cache))
                 else:
                     st.error("Failed to generate summary.")
 
@@ -153,25 +433,72 @@ if st.session_state['video_id']:
         st.video(video_url)
 
 # Display summary
-if st.session_state['summary']:
+summary = st.session_state['summary_ref'].get() if st.session_state['summary_ref'] is not None else None
+transcript = st.session_state['transcript_ref'].get() if st.session_state['transcript_ref'] is not None else None
+if summary:
     st.markdown("## 📝 Summary")
-    st.markdown(st.session_state['summary'])
+    st.markdown(summary)
+    if st.session_state['summary_time_to_first_token'] is not None:
+        st.caption(f"First token after {st.session_state['summary_time_to_first_token']:.2f}s")
     
+    if st.session_state['compaction_stats']:
+        st.caption(format_stats(st.session_state['compaction_stats']))
+
     # Show transcript expander
     with st.expander("View Full Transcript"):
-        st.write(st.session_state['transcript_text'])
+        st.write(transcript.text if transcript is not None else "")
 
 # Q&A Section
-if st.session_state['transcript_text']:
+if transcript is not None:
     st.markdown("---")
     st.markdown("## ❓ Ask a Question about the Video")
     question = st.text_input("Enter your question:", placeholder="What is the main topic discussed in this video?")
 
     if question:
         with st.spinner("Answering question with Gemini 1.5 Pro..."):
-            answer = answer_question(st.session_state['transcript_text'], question)
+            st.markdown("### Answer:")
+            answer_placeholder = st.empty()
+            st.session_state['time_to_first_token'] = None
+            answer = answer_question(transcript.text, question, bypass_cache,
+                                     video_id=st.session_state['video_id'], compact=compact_transcript,
+                                     use_context_cache=use_context_cache,
+                                     on_chunk=stream_into(answer_placeholder) if stream_responses else None)
             if answer:
-                st.markdown("### Answer:")
-                st.markdown(answer)
+                answer_placeholder.markdown(answer)
+                if st.session_state['time_to_first_token'] is not None:
+                    st.caption(f"First token after {st.session_state['time_to_first_token']:.2f}s")
             else:
-                st.error("Failed to generate an answer.") 
\ No newline at end of file
+                st.error("Failed to generate an answer.")
+
+    # Several questions are answered together, sending the transcript once
+    question_list = st.text_area("Or ask several questions at once (one per line):",
+                                 placeholder="What is the main topic?\nWho is speaking?\nWhat are the key takeaways?")
+    questions = [line.strip() for line in question_list.splitlines() if line.strip()]
+    if questions and st.button("Answer All Questions"):
+        with st.spinner(f"Answering {len(questions)} questions with Gemini 1.5 Pro..."):
+            answers = answer_questions(transcript.text, questions, bypass_cache,
+                                       video_id=st.session_state['video_id'], compact=compact_transcript)
+        if answers:
+            for question, answer in zip(questions, answers):
+                st.markdown(f"**{question}**")
+                st.markdown(answer)
+        else:
+            st.error("Failed to generate answers.")
+
+# Debug panel with per-stage timings, rendered last so it includes this run
+if st.sidebar.checkbox("Show stage timings", value=False):
+    with st.sidebar.expander("Stage timings", expanded=True):
+        st.dataframe([
+            {
+                "stage": stage["stage"],
+                "kind": stage["labels"].get("kind", ""),
+                "count": stage["count"],
+                "mean (s)": round(stage["mean_seconds"], 3),
+                "max (s)": round(stage["max_seconds"], 3),
+                "errors": stage["errors"],
+                **stage["sizes"],
+            }
+            for stage in metrics.metrics.snapshot()
+        ], hide_index=True)
+        st.download_button("Download metrics JSON", metrics.metrics.to_json(include_recent=True),
+                           file_name="metrics.json", mime="application/json")
@@ -0,0 +1,180 @@
+"""Local stand-ins for the YouTube transcript API and Gemini.
+
+``install()`` registers fake ``youtube_transcript_api`` and
+``google.generativeai`` modules in ``sys.modules``. It must run before any
+project module is imported; the real pipeline code then runs unchanged
+against backends with configurable latency, error rate and transcript size,
+without API keys or network access.
+"""
+import random
+import sys
+import time
+import types
+
+
+class FakeAPIError(Exception):
+    """Error raised by the fake Gemini backend, carrying an HTTP status like google.api_core errors."""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+
+class TranscriptsDisabled(Exception):
+    pass
+
+
+class NoTranscriptFound(Exception):
+    pass
+
+
+WORDS = ("rocket engine launch orbit fuel thrust design test data result team mission "
+         "problem solution market growth model training value energy battery system").split()
+
+
+class FakeTranscript:
+    """One listed transcript; fetching it goes through FakeYouTubeTranscriptApi.get_transcript."""
+
+    is_generated = False
+    translation_languages = []
+
+    def __init__(self, video_id, language_code):
+        self.video_id = video_id
+        self.language_code = language_code
+
+    def fetch(self):
+        return FakeYouTubeTranscriptApi.get_transcript(self.video_id, (self.language_code,))
+
+
+class FakeTranscriptList:
+    """Listing with a manual transcript in every requested language."""
+
+    def __init__(self, video_id):
+        self.video_id = video_id
+
+    def __iter__(self):
+        return iter([FakeTranscript(self.video_id, "en")])
+
+    def find_transcript(self, languages):
+        return FakeTranscript(self.video_id, languages[0])
+
+    find_manually_created_transcript = find_transcript
+
+
+class FakeYouTubeTranscriptApi:
+    """Serves generated transcripts after a configurable delay."""
+
+    latency = 0.2
+    error_rate = 0.0
+    segments = 1000
+    words_per_segment = 12
+
+    @classmethod
+    def list_transcripts(cls, video_id):
+        return FakeTranscriptList(video_id)
+
+    @classmethod
+    def get_transcript(cls, video_id, languages=("en",)):
+        time.sleep(cls.latency)
+        rng = random.Random(video_id)
+        if rng.random() < cls.error_rate:
+            raise TranscriptsDisabled(video_id)
+        return [
+            {
+                "text": " ".join(rng.choice(WORDS) for _ in range(cls.words_per_segment)),
+                "start": index * 3.0,
+                "duration": 3.0,
+            }
+            for index in range(cls.segments)
+        ]
+
+
+class _Part:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Content:
+    def __init__(self, text):
+        self.parts = [_Part(text)]
+
+
+class _Candidate:
+    def __init__(self, text):
+        self.content = _Content(text)
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.candidates = [_Candidate(text)]
+
+
+class FakeGenerativeModel:
+    """Generates placeholder text with latency that grows with prompt and output size."""
+
+    base_latency = 0.3
+    seconds_per_1k_prompt_tokens = 0.02
+    output_words = 200
+    seconds_per_output_word = 0.002
+    stream_chunks = 10
+    error_rate = 0.0
+    error_code = 503
+
+    def __init__(self, model_name, generation_config=None, **kwargs):
+        self.model_name = model_name
+
+    def _check_error(self):
+        if random.random() < self.error_rate:
+            raise FakeAPIError("Service unavailable (fake backend)", self.error_code)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        prompt_delay = self.base_latency + len(prompt) / 4000 * self.seconds_per_1k_prompt_tokens
+        words = [WORDS[index % len(WORDS)] for index in range(self.output_words)]
+
+        if not stream:
+            time.sleep(prompt_delay + self.output_words * self.seconds_per_output_word)
+            self._check_error()
+            return FakeResponse(" ".join(words))
+
+        def chunks():
+            time.sleep(prompt_delay)
+            self._check_error()
+            size = max(1, len(words) // self.stream_chunks)
+            for start in range(0, len(words), size):
+                piece = words[start:start + size]
+                time.sleep(len(piece) * self.seconds_per_output_word)
+                yield FakeResponse(" ".join(piece) + " ")
+        return chunks()
+
+
+def install():
+    """Registers the fake modules so later imports of the real ones resolve to them."""
+    errors = types.ModuleType("youtube_transcript_api._errors")
+    errors.TranscriptsDisabled = TranscriptsDisabled
+    errors.NoTranscriptFound = NoTranscriptFound
+    transcript_api = types.ModuleType("youtube_transcript_api")
+    transcript_api.YouTubeTranscriptApi = FakeYouTubeTranscriptApi
+    transcript_api._errors = errors
+
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = FakeGenerativeModel
+    try:
+        # Keep the real namespace package so google.protobuf (used by Streamlit) still imports
+        import google
+    except ImportError:
+        google = types.ModuleType("google")
+        google.__path__ = []
+    google.generativeai = genai
+
+    dotenv = types.ModuleType("dotenv")
+    dotenv.load_dotenv = lambda *args, **kwargs: False
+
+    sys.modules.update({
+        "youtube_transcript_api": transcript_api,
+        "youtube_transcript_api._errors": errors,
+        "google": google,
+        "google.generativeai": genai,
+        "dotenv": dotenv,
+    })
@@ -0,0 +1,218 @@
+"""Offline benchmark suite for the summarizer pipeline.
+
+Drives the real pipeline functions (``extract_transcript_details``,
+``summarize_text`` and ``answer_question`` from ``app.py`` and the CLI
+``main``) against the local stand-ins in ``fakes.py`` and reports latency
+percentiles, throughput and peak memory for each combination of transcript
+length and concurrency. Results are written as JSON; pass a previous results
+file with ``--compare`` to see regressions between runs.
+
+Example:
+    python benchmarks/run_benchmarks.py --segments 200,2000 --concurrency 1,8 --output bench.json
+"""
+import argparse
+import contextlib
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fakes
+
+fakes.install()
+
+# The fake backends are the bottleneck under test, not the client-side quotas
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark")
+os.environ.setdefault("GEMINI_REQUESTS_PER_MINUTE", "1000000")
+os.environ.setdefault("GEMINI_TOKENS_PER_MINUTE", "1000000000")
+os.environ.setdefault("GEMINI_MAX_CONCURRENCY", "1024")
+os.environ.setdefault("RESULT_CACHE_BACKEND", "memory")
+
+TARGETS = ("summarize", "answer", "cli")
+QUESTION = "What does the video say about the rocket engine design?"
+WARM_VIDEO_POOL = 4
+REGRESSION_THRESHOLD = 0.10
+
+
+def load_pipeline():
+    """Imports the Streamlit app (in bare mode) and the CLI against the fake backends."""
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    with contextlib.redirect_stderr(open(os.devnull, "w")):
+        import app
+        import gemini_1_5_cli
+    for name in logging.root.manager.loggerDict:
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+    return app, gemini_1_5_cli
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def reset_caches(app, cold):
+    import transcript_cache
+
+    # A zero-byte cap evicts every entry on write, so every lookup is a miss
+    transcript_cache._default_cache = transcript_cache.TranscriptCache(":memory:", max_bytes=0 if cold else 1 << 40)
+    app.get_result_cache().backend.clear()
+
+
+def make_request(app, cli, target, video_id, cold):
+    """Runs one request through the pipeline and returns True on success."""
+    if target == "cli":
+        cli.main(["--no-daemon", video_id])
+        return True
+
+    transcript, video_id = app.extract_transcript_details(f"https://www.youtube.com/watch?v={video_id}")
+    if not transcript:
+        return False
+    if target == "summarize":
+        return app.summarize_text(transcript, 250, bypass_cache=cold) is not None
+    return app.answer_question(transcript, QUESTION, bypass_cache=cold, video_id=video_id) is not None
+
+
+def run_scenario(app, cli, target, segments, concurrency, requests, cold):
+    fakes.FakeYouTubeTranscriptApi.segments = segments
+    reset_caches(app, cold)
+
+    def timed(index):
+        video_id = f"bench{segments}x{index if cold else index % WARM_VIDEO_POOL}"
+        start = time.perf_counter()
+        try:
+            ok = make_request(app, cli, target, video_id, cold)
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(timed, range(requests)))
+    wall_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = [latency for latency, _ in outcomes]
+    return {
+        "target": target,
+        "transcript_segments": segments,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(1 for _, ok in outcomes if not ok),
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "mean": sum(latencies) / len(latencies),
+        "throughput_rps": requests / wall_time,
+        "wall_time": wall_time,
+        "peak_memory_mb": peak / (1024 * 1024),
+    }
+
+
+def scenario_key(result):
+    return result["target"], result["transcript_segments"], result["concurrency"]
+
+
+def compare(results, previous_path):
+    """Prints p50/p95/throughput changes against a previous results file and returns the regressions."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {scenario_key(result): result for result in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\nComparison with {previous_path}:")
+    for result in results:
+        old = previous.get(scenario_key(result))
+        if old is None:
+            continue
+        changes = {
+            "p50": result["p50"] / old["p50"] - 1,
+            "p95": result["p95"] / old["p95"] - 1,
+            "throughput_rps": 1 - result["throughput_rps"] / old["throughput_rps"],
+        }
+        flag = ""
+        if any(change > REGRESSION_THRESHOLD for change in changes.values()):
+            flag = "  <-- REGRESSION"
+            regressions.append(scenario_key(result))
+        print("  {:<9} segments={:<6} concurrency={:<3} p50 {:+.0%}  p95 {:+.0%}  throughput {:+.0%}{}".format(
+            *scenario_key(result), changes["p50"], changes["p95"], -changes["throughput_rps"], flag))
+    return regressions
+
+
+def parse_list(value):
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the YouTube summarizer pipeline")
+    parser.add_argument("--targets", default=",".join(TARGETS),
+                        help=f"Comma-separated pipeline targets to run ({', '.join(TARGETS)})")
+    parser.add_argument("--segments", type=parse_list, default=[200, 2000, 10000],
+                        help="Comma-separated transcript lengths in segments (about 12 words each)")
+    parser.add_argument("--concurrency", type=parse_list, default=[1, 4, 16],
+                        help="Comma-separated numbers of concurrent requests")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per scenario")
+    parser.add_argument("--cache", choices=("cold", "warm"), default="cold",
+                        help="cold: every request misses the caches; warm: requests repeat a few videos")
+    parser.add_argument("--transcript-latency", type=float, default=fakes.FakeYouTubeTranscriptApi.latency,
+                        help="Seconds per fake transcript fetch")
+    parser.add_argument("--model-latency", type=float, default=fakes.FakeGenerativeModel.base_latency,
+                        help="Base seconds per fake Gemini call")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of fake transcript fetches and Gemini calls that fail")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", metavar="FILE", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    targets = [target for target in args.targets.split(",") if target]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+
+    fakes.FakeYouTubeTranscriptApi.latency = args.transcript_latency
+    fakes.FakeYouTubeTranscriptApi.error_rate = args.error_rate
+    fakes.FakeGenerativeModel.base_latency = args.model_latency
+    fakes.FakeGenerativeModel.error_rate = args.error_rate
+
+    app, cli = load_pipeline()
+    cold = args.cache == "cold"
+
+    results = []
+    print(f"{'target':<10}{'segments':>9}{'conc':>6}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}{'req/s':>9}{'peak MB':>9}{'errors':>8}")
+    for target in targets:
+        for segments in args.segments:
+            for concurrency in args.concurrency:
+                result = run_scenario(app, cli, target, segments, concurrency, args.requests, cold)
+                results.append(result)
+                print(f"{target:<10}{segments:>9}{concurrency:>6}{result['p50']:>9.3f}{result['p95']:>9.3f}"
+                      f"{result['p99']:>9.3f}{result['throughput_rps']:>9.2f}{result['peak_memory_mb']:>9.1f}"
+                      f"{result['errors']:>8}")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
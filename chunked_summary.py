@@ -0,0 +1,126 @@
+"""Map-reduce summarization for long transcripts.
+
+Long transcripts are split into token-budgeted windows that overlap slightly
+so no point is cut in half. Each window is summarized in parallel (map); the
+caller then combines the partial summaries into the final length (reduce).
+Partial summaries do not depend on the final word count, so when a result
+cache is supplied they are reused across different summary lengths.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from result_cache import make_key
+from transcript import Transcript
+
+CHARS_PER_TOKEN = 4  # rough average for English text
+DEFAULT_CHUNK_TOKENS = 6000
+DEFAULT_OVERLAP_TOKENS = 200
+DEFAULT_MAX_WORKERS = 4
+LONG_TRANSCRIPT_TOKENS = 12000  # below this a single prompt is faster than map-reduce
+
+CHUNK_PROMPT = (
+    "Summarize this section of a YouTube video transcript. Keep every key point, "
+    "name, number and conclusion so the section summaries can later be combined: {text}"
+)
+
+
+def estimate_tokens(text):
+    """Estimates the number of tokens in text without calling the API."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def segments_from_text(text, words_per_segment=50):
+    """Splits a joined transcript string into untimed segments for chunking."""
+    words = text.split()
+    return [
+        {"text": " ".join(words[i:i + words_per_segment])}
+        for i in range(0, len(words), words_per_segment)
+    ]
+
+
+def split_segments(segments, max_tokens=DEFAULT_CHUNK_TOKENS, overlap_tokens=DEFAULT_OVERLAP_TOKENS):
+    """Groups transcript segments into windows of at most max_tokens each.
+
+    Each window after the first starts with the trailing segments of the
+    previous one, up to overlap_tokens. Returns a list of dicts with the
+    window ``text`` and its ``start``/``end`` time in seconds (None when the
+    segments are untimed). A Transcript is split with ``Transcript.chunks``,
+    which finds the windows from its offsets without building segment dicts.
+    """
+    if isinstance(segments, Transcript):
+        return [
+            {"text": window.text, "start": window.start, "end": window.end}
+            for window in segments.chunks(max_tokens * CHARS_PER_TOKEN, overlap_tokens * CHARS_PER_TOKEN)
+        ]
+
+    chunks = []
+    window = []
+    window_tokens = 0
+
+    def flush():
+        first, last = window[0], window[-1]
+        end = None
+        if last.get("start") is not None:
+            end = last["start"] + last.get("duration", 0)
+        chunks.append({
+            "text": " ".join(segment["text"] for segment in window),
+            "start": first.get("start"),
+            "end": end,
+        })
+
+    for segment in segments:
+        tokens = estimate_tokens(segment["text"])
+        if window and window_tokens + tokens > max_tokens:
+            flush()
+            overlap = []
+            overlap_size = 0
+            for previous in reversed(window):
+                size = estimate_tokens(previous["text"])
+                if overlap_size + size > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_size += size
+            window, window_tokens = overlap, overlap_size
+        window.append(segment)
+        window_tokens += tokens
+    if window:
+        flush()
+    return chunks
+
+
+def summarize_chunks(chunks, generate, max_workers=DEFAULT_MAX_WORKERS, cache=None, model_name="", bypass_cache=False):
+    """Summarizes each chunk in parallel and returns the partial summaries in order.
+
+    ``generate`` takes a prompt and returns the generated text. It should raise
+    on failure; the first error is re-raised here.
+    """
+    def summarize(chunk):
+        def compute():
+            return generate(CHUNK_PROMPT.format(text=chunk["text"]))
+
+        if cache is None:
+            return compute()
+        key = make_key(chunk["text"], model_name, CHUNK_PROMPT)
+        return cache.get_or_compute(key, compute, bypass=bypass_cache)
+
+    if len(chunks) == 1:
+        return [summarize(chunks[0])]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        return list(executor.map(summarize, chunks))
+
+
+def format_time(seconds):
+    """Formats seconds as m:ss, or h:mm:ss for times past an hour."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+def join_chunk_summaries(chunks, summaries):
+    """Labels each partial summary with its part number and time range for the reduce prompt."""
+    parts = []
+    for index, (chunk, summary) in enumerate(zip(chunks, summaries), start=1):
+        label = f"Part {index}"
+        if chunk["start"] is not None and chunk["end"] is not None:
+            label += f" ({format_time(chunk['start'])}-{format_time(chunk['end'])})"
+        parts.append(f"{label}:\n{summary}")
+    return "\n\n".join(parts)
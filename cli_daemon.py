@@ -0,0 +1,198 @@
+"""Long-lived daemon for the command-line interface, and its thin client.
+
+``python gemini_1_5_cli.py --daemon`` loads the heavy modules once and keeps
+the Gemini clients, transcript caches and rate limiter warm, listening on a
+Unix socket. Later invocations of the CLI find the socket and forward their
+arguments instead of running locally, so a call from a shell loop costs a
+socket round trip rather than a full interpreter start-up and import.
+
+The API key, model limits and cache settings are read from the environment
+once, when the daemon starts, so a client whose settings differ is refused
+and runs the command itself. Only hashes of the values are sent.
+
+Protocol: the client sends one JSON line ``{"argv", "cwd", "env"}``; the
+daemon answers ``{"env_mismatch": names}`` and closes, or ``{"ready": true}``,
+after which the client sends ``{"stdin": text}``. The daemon then answers
+with JSON lines ``{"stdout": text}`` / ``{"stderr": text}`` as output is
+produced (so streaming works) and a final ``{"exit": code}``.
+Requests run one at a time because their output is captured by swapping
+``sys.stdout`` and ``sys.stderr``; batch mode still runs its videos
+concurrently within a request.
+"""
+import contextlib
+import hashlib
+import json
+import os
+import signal
+import socket
+import sys
+import threading
+import traceback
+
+DEFAULT_SOCKET_PATH = os.getenv(
+    "YT_SUMMARIZER_SOCKET",
+    os.path.join(os.path.expanduser("~"), ".cache", "yt_summarizer", "cli.sock"),
+)
+# Settings the daemon reads once at start-up; a client must have the same ones to be served
+ENVIRONMENT_PREFIXES = ("GOOGLE_API_KEY", "GEMINI_", "TRANSCRIPT_", "RESULT_CACHE_", "CONTEXT_CACHE_",
+                        "PLAYLIST_", "SUMMARY_", "PREFETCH_")
+
+
+def environment_fingerprint(environ=None):
+    """Returns {name: hash of value} for the settings in environ that the daemon depends on."""
+    environ = os.environ if environ is None else environ
+    return {
+        name: hashlib.sha256(value.encode("utf-8")).hexdigest()
+        for name, value in environ.items()
+        if name.startswith(ENVIRONMENT_PREFIXES)
+    }
+
+
+def _mismatched(client, daemon):
+    return sorted(name for name in set(client) | set(daemon) if client.get(name) != daemon.get(name))
+
+
+class _SocketStream:
+    """File-like object that sends every write to the client as one JSON message."""
+
+    def __init__(self, connection, name, lock):
+        self._connection = connection
+        self._name = name
+        self._lock = lock
+
+    def write(self, text):
+        if text:
+            data = (json.dumps({self._name: text}) + "\n").encode("utf-8")
+            with self._lock:
+                self._connection.sendall(data)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _read_message(connection):
+    buffer = b""
+    while not buffer.endswith(b"\n"):
+        data = connection.recv(65536)
+        if not data:
+            break
+        buffer += data
+    return json.loads(buffer) if buffer else None
+
+
+def _send(connection, message):
+    connection.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+
+def _handle(connection, run, run_lock, environment):
+    with connection:
+        request = _read_message(connection)
+        if request is None:
+            return
+        mismatched = _mismatched(request.get("env", {}), environment)
+        if mismatched:
+            _send(connection, {"env_mismatch": mismatched})
+            return
+        _send(connection, {"ready": True})
+        message = _read_message(connection)
+        if message is None:
+            return
+        send_lock = threading.Lock()
+        stdout = _SocketStream(connection, "stdout", send_lock)
+        stderr = _SocketStream(connection, "stderr", send_lock)
+        code = 0
+        try:
+            with run_lock, contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    run(request["argv"], request.get("cwd"), message.get("stdin"))
+                except SystemExit as e:
+                    if e.code is None or isinstance(e.code, int):
+                        code = e.code or 0
+                    else:
+                        print(e.code, file=sys.stderr)
+                        code = 1
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+            _send(connection, {"exit": code})
+        except OSError:
+            pass  # Client went away mid-request
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(run, path=DEFAULT_SOCKET_PATH):
+    """Serves CLI requests on a Unix socket until interrupted or terminated; run(argv, cwd, stdin) executes one request."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        # Nothing listening; remove a socket file left behind by a daemon that died
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+    else:
+        raise RuntimeError(f"A daemon is already listening on {path}")
+    finally:
+        probe.close()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen()
+    print(f"Listening on {path}", file=sys.stderr)
+    run_lock = threading.Lock()
+    environment = environment_fingerprint()
+    # SIGTERM (kill, systemd, docker stop) shuts down like Ctrl-C, so the socket file is removed
+    previous = signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        while True:
+            connection, _ = server.accept()
+            threading.Thread(target=_handle, args=(connection, run, run_lock, environment), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+
+
+def forward(argv, path=DEFAULT_SOCKET_PATH, stdin=None):
+    """Runs argv on the daemon, relaying its output; returns the exit code.
+
+    Returns None, to run the command locally, if no daemon is listening or
+    the daemon was started with different settings. stdin, if given, is a
+    file read and sent along only once the daemon has accepted the request.
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+
+    with client:
+        _send(client, {"argv": list(argv), "cwd": os.getcwd(), "env": environment_fingerprint()})
+        with client.makefile("r", encoding="utf-8") as responses:
+            for line in responses:
+                message = json.loads(line)
+                if "env_mismatch" in message:
+                    print(f"Daemon settings differ ({', '.join(message['env_mismatch'])}); running locally.",
+                          file=sys.stderr)
+                    return None
+                if "ready" in message:
+                    _send(client, {"stdin": stdin.read() if stdin is not None else None})
+                    continue
+                if "exit" in message:
+                    return message["exit"]
+                if "stdout" in message:
+                    sys.stdout.write(message["stdout"])
+                    sys.stdout.flush()
+                else:
+                    sys.stderr.write(message["stderr"])
+                    sys.stderr.flush()
+    print("Daemon closed the connection unexpectedly.", file=sys.stderr)
+    return 1
@@ -0,0 +1,202 @@
+"""Server-side context caching for multi-question sessions on one video.
+
+Without it, every question about a video sends the transcript (or excerpts of
+it) again. ``ContextCache`` uploads the transcript once as Gemini cached
+content and hands out a model bound to it, so each follow-up question sends
+only the question itself and the cached input tokens are billed at the
+reduced cached rate. The cache entry is shared by every session asking about
+the same transcript and is recreated once its TTL runs out.
+
+Gemini only caches contexts above a minimum size, so ``get_model`` returns
+None for short transcripts or when the cache cannot be created, and callers
+fall back to their regular prompts. A failed create is remembered for
+``CONTEXT_CACHE_FAILURE_BACKOFF`` seconds, so every question in that window
+falls back at once instead of retrying the upload. ``CONTEXT_CACHE_BACKEND=local`` swaps in
+a local stand-in that prepends the context to each prompt client-side, for
+exercising the flow without the caching API.
+"""
+import datetime
+import hashlib
+import os
+import threading
+import time
+
+import google.generativeai as genai
+
+import model_registry
+from chunked_summary import estimate_tokens
+from single_flight import SingleFlight
+
+DEFAULT_TTL = int(os.getenv("CONTEXT_CACHE_TTL", 3600))  # one hour
+# Gemini rejects cached contents smaller than this
+GEMINI_MIN_TOKENS = int(os.getenv("CONTEXT_CACHE_MIN_TOKENS", 32768))
+# Entries this close to expiry are recreated rather than risk expiring mid-request
+EXPIRY_MARGIN = 60
+# How long a context whose cache could not be created falls back without retrying
+FAILURE_BACKOFF = int(os.getenv("CONTEXT_CACHE_FAILURE_BACKOFF", 300))
+# Stable versions to cache against; CachedContent rejects the unversioned aliases
+VERSIONED_MODELS = {
+    "gemini-1.5-pro": "gemini-1.5-pro-002",
+    "gemini-1.5-flash": "gemini-1.5-flash-002",
+}
+SYSTEM_INSTRUCTION = (
+    "You answer questions about the YouTube video whose transcript is provided. "
+    "Base your answers on the transcript only."
+)
+
+
+def versioned_model(model_name):
+    """Returns the explicit version of an aliased model name such as gemini-1.5-pro; other names are returned as is."""
+    name = model_name[len("models/"):] if model_name.startswith("models/") else model_name
+    return VERSIONED_MODELS.get(name, name)
+
+
+class ContextUnavailable(Exception):
+    """Raised by callers when get_model returned None, to fall back to their regular prompt."""
+
+
+class GeminiBackend:
+    """Stores the context as Gemini cached content."""
+
+    min_tokens = GEMINI_MIN_TOKENS
+
+    def create(self, model_name, context, ttl):
+        # Cached content is tied to an explicit model version, e.g. gemini-1.5-pro-002
+        model_name = os.getenv("CONTEXT_CACHE_MODEL") or versioned_model(model_name)
+        cached = genai.caching.CachedContent.create(
+            model=model_name if model_name.startswith("models/") else f"models/{model_name}",
+            system_instruction=SYSTEM_INSTRUCTION,
+            contents=[context],
+            ttl=datetime.timedelta(seconds=ttl),
+        )
+        return cached, genai.GenerativeModel.from_cached_content(cached_content=cached)
+
+    def delete(self, handle):
+        try:
+            handle.delete()
+        except Exception:
+            pass  # Expires on its own after the TTL
+
+
+class _LocalCachedModel:
+    def __init__(self, model, prefix):
+        self._model = model
+        self._prefix = prefix
+
+    def generate_content(self, prompt, **kwargs):
+        return self._model.generate_content(self._prefix + prompt, **kwargs)
+
+
+class LocalBackend:
+    """Local stand-in for Gemini context caching that prepends the context to every prompt."""
+
+    min_tokens = 0
+
+    def create(self, model_name, context, ttl):
+        prefix = f"{SYSTEM_INSTRUCTION}\n\nTranscript: {context}\n\n"
+        return None, _LocalCachedModel(model_registry.get_model(model_name), prefix)
+
+    def delete(self, handle):
+        pass
+
+
+class ContextCache:
+    """Shares one cached-context model per (model, context) between callers until its TTL runs out."""
+
+    def __init__(self, backend, ttl=DEFAULT_TTL, failure_backoff=FAILURE_BACKOFF):
+        self.backend = backend
+        self.ttl = ttl
+        self.failure_backoff = failure_backoff
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._failed = {}  # key -> time after which creating it may be retried
+        self._creating = SingleFlight()
+        self.created = 0
+        self.reused = 0
+        self.fallbacks = 0
+        self.failures = 0
+        self.cached_tokens = 0
+
+    @staticmethod
+    def make_key(model_name, context):
+        return hashlib.sha256(f"{model_name}\0{context}".encode("utf-8")).hexdigest()
+
+    def eligible(self, context):
+        """Returns whether context is large enough to cache; cheap, creates nothing."""
+        return estimate_tokens(context) >= self.backend.min_tokens
+
+    def get_model(self, model_name, context):
+        """Returns a model with context already cached, or None if the caller should send the full prompt."""
+        tokens = estimate_tokens(context)
+        if tokens < self.backend.min_tokens:
+            with self._lock:
+                self.fallbacks += 1
+            return None
+
+        key = self.make_key(model_name, context)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["expires_at"] - EXPIRY_MARGIN > time.time():
+                self.reused += 1
+                self.cached_tokens += tokens
+                return entry["model"]
+            if self._failed.get(key, 0) > time.time():
+                self.fallbacks += 1
+                return None
+
+        try:
+            entry = self._creating.do(key, lambda: self._create(key, model_name, context))
+        except Exception:
+            with self._lock:
+                self._failed[key] = time.time() + self.failure_backoff
+                self.failures += 1
+                self.fallbacks += 1
+            return None
+        return entry["model"]
+
+    def _create(self, key, model_name, context):
+        expires_at = time.time() + self.ttl
+        handle, model = self.backend.create(model_name, context, self.ttl)
+        entry = {"handle": handle, "model": model, "expires_at": expires_at}
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = entry
+            self._failed.pop(key, None)
+            self.created += 1
+            # Drop entries that have expired server-side anyway, and failures past their backoff
+            now = time.time()
+            for stale_key in [k for k, e in self._entries.items() if e["expires_at"] <= now]:
+                del self._entries[stale_key]
+            for stale_key in [k for k, retry_at in self._failed.items() if retry_at <= now]:
+                del self._failed[stale_key]
+        if previous is not None:
+            self.backend.delete(previous["handle"])
+        return entry
+
+    def invalidate(self, model_name, context):
+        """Forgets the cached context, e.g. after a generation with it failed."""
+        with self._lock:
+            entry = self._entries.pop(self.make_key(model_name, context), None)
+        if entry is not None:
+            self.backend.delete(entry["handle"])
+
+    def stats(self):
+        """Returns counts of created and reused contexts, failed creates, fallbacks and input tokens served from cache."""
+        with self._lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "failures": self.failures,
+                "fallbacks": self.fallbacks,
+                "cached_tokens": self.cached_tokens,
+            }
+
+
+def create_context_cache(backend_name=None):
+    """Creates a ContextCache using the backend named by ``CONTEXT_CACHE_BACKEND`` (gemini or local)."""
+    backend_name = backend_name or os.getenv("CONTEXT_CACHE_BACKEND", "gemini")
+    if backend_name == "gemini":
+        return ContextCache(GeminiBackend())
+    if backend_name == "local":
+        return ContextCache(LocalBackend())
+    raise ValueError(f"Unknown context cache backend: {backend_name}")
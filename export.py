@@ -0,0 +1,167 @@
+"""Incremental structured export of per-video results.
+
+Batch runs produce one record per video: the video and its ID, the
+transcript language and length, the model, the summary or answers (or the
+error), per-stage timings and token usage. Writers take records one at a time
+as each video completes, so a run of any length never holds more than a
+bounded number of results in memory:
+
+    jsonl    one JSON object per line, flushed after every record; a crashed
+             run leaves every finished record readable
+    parquet  columnar, for analytics (``pip install pyarrow``); rows are
+             buffered and written as one row group per ``batch_size`` records.
+             The file is complete once the writer is closed.
+
+Parquet files cannot be appended to, so resumable (``--jobs``) runs rewrite
+them in full from the job store with ``write_records`` when they finish.
+"""
+import json
+import os
+import sys
+
+FORMATS = ("jsonl", "parquet")
+DEFAULT_BATCH_SIZE = 500
+
+
+class JSONLWriter:
+    """Writes one JSON line per record to a stream or file, flushing each as it is written."""
+
+    def __init__(self, path_or_stream=None, append=False):
+        if path_or_stream is None or path_or_stream == "-":
+            self.stream, self._owned = sys.stdout, False
+        elif isinstance(path_or_stream, str):
+            self.stream, self._owned = open(path_or_stream, "a" if append else "w", encoding="utf-8"), True
+        else:
+            self.stream, self._owned = path_or_stream, False
+        self.count = 0
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+        self.count += 1
+
+    def close(self):
+        if self._owned:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetWriter:
+    """Writes records to a Parquet file in row groups of batch_size records."""
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+
+        self._pa = pa
+        self.schema = pa.schema([
+            ("video", pa.string()),
+            ("video_id", pa.string()),
+            ("language", pa.string()),
+            ("transcript_chars", pa.int64()),
+            ("model", pa.string()),
+            ("summary", pa.string()),
+            ("question", pa.string()),
+            ("answer", pa.string()),
+            ("answers", pa.list_(pa.struct([("question", pa.string()), ("answer", pa.string())]))),
+            ("error", pa.string()),
+            ("timings", pa.struct([("fetch_seconds", pa.float64()), ("generate_seconds", pa.float64())])),
+            ("usage", pa.struct([("calls", pa.int64()), ("prompt_tokens", pa.int64()),
+                                 ("output_tokens", pa.int64())])),
+        ])
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self._rows = []
+        self.count = 0
+
+    def write(self, record):
+        # Fields outside the schema are dropped; missing ones are null
+        self._rows.append({name: record.get(name) for name in self.schema.names})
+        self.count += 1
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered records as a row group."""
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NullWriter:
+    """Discards records, for runs whose output is written afterwards with write_records."""
+
+    count = 0
+
+    def write(self, record):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def resolve_format(path=None, format=None):
+    """Returns format, or the one implied by path's extension (parquet for .parquet, else jsonl)."""
+    if format is None:
+        format = "parquet" if path and path.endswith(".parquet") else "jsonl"
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format: {format}")
+    return format
+
+
+def open_writer(path=None, format=None, append=False):
+    """Opens a writer for path ('-' or None for stdout); the format defaults from the extension, else jsonl.
+
+    With append, a JSONL file is extended rather than replaced, for resumed
+    runs. Parquet files cannot be appended to; use write_records instead.
+    """
+    format = resolve_format(path, format)
+    if format == "jsonl":
+        return JSONLWriter(path, append)
+    if not path or path == "-":
+        raise ValueError("Parquet export needs an output file")
+    if append:
+        raise ValueError("Parquet files cannot be appended to")
+    return ParquetWriter(path)
+
+
+def write_records(path, records, format=None):
+    """Writes records to path as a whole new file, replacing it only once every record is written."""
+    if not path or path == "-":
+        with open_writer(path, format) as writer:
+            for record in records:
+                writer.write(record)
+        return
+    temporary = f"{path}.tmp"
+    try:
+        with open_writer(temporary, resolve_format(path, format)) as writer:
+            for record in records:
+                writer.write(record)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
@@ -1,101 +1,580 @@
-import google.generativeai as genai
-from youtube_transcript_api import YouTubeTranscriptApi
+"""Command-line YouTube summarizer and Q&A.
+
+The Gemini and YouTube client libraries are imported on first use, so
+``--help`` and argument errors return immediately. ``--daemon`` keeps a warm
+process listening on a Unix socket that later invocations forward to (see
+cli_daemon.py).
+"""
+from transcript import Transcript
+from chunked_summary import (LONG_TRANSCRIPT_TOKENS, estimate_tokens, join_chunk_summaries,
+                             segments_from_text, split_segments, summarize_chunks)
+from transcript_index import TranscriptIndex, format_context
+from streaming import generate_streaming
+from transcript_compaction import compact_segments, format_stats
+from rate_limiter import get_rate_limiter
+from job_store import JobStore, TRANSCRIPT_FETCHED, DEFAULT_MAX_ATTEMPTS
+from pipeline import run_pipeline
+from playlist import expand, is_collection_url
+from multi_question import JSON_GENERATION_CONFIG, answer_questions
+from export import FORMATS, JSONLWriter, NullWriter, open_writer, resolve_format, write_records
+import metrics
 import os
+import io
+import sys
+import time
 import argparse
-from dotenv import load_dotenv
+import hashlib
+import threading
+from collections import OrderedDict
+
+MODEL_NAME = 'gemini-1.5-pro'  # Using the newer Gemini 1.5 Pro model
+EXPAND_WORKERS = 2
+INDEX_CACHE_SIZE = 64
+
+class TokenUsage:
+    """Gemini calls and token counts for one video, added to from any thread."""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def add(self, prompt_tokens, output_tokens):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
 
-# Load environment variables
-load_dotenv()
+    def to_dict(self):
+        with self._lock:
+            return {"calls": self.calls, "prompt_tokens": self.prompt_tokens, "output_tokens": self.output_tokens}
 
-# Configure the Gemini API
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # Get API key from environment variable
+def get_model(model_name, generation_config=None):
+    """Returns the shared Gemini model, loading the client library and configuring the API key on first use."""
+    import model_registry
 
-if not GOOGLE_API_KEY:
-    raise ValueError("Please set the GOOGLE_API_KEY environment variable.")
+    if model_registry.configured_api_key() is None:
+        from dotenv import load_dotenv
 
-genai.configure(api_key=GOOGLE_API_KEY)
+        # Load environment variables
+        load_dotenv()
+        # Configure the Gemini API
+        api_key = os.getenv("GOOGLE_API_KEY")  # Get API key from environment variable
+        if not api_key:
+            raise ValueError("Please set the GOOGLE_API_KEY environment variable.")
+        model_registry.configure(api_key)
+    return model_registry.get_model(model_name, generation_config)
 
-def get_youtube_transcript(video_id):
-    """Fetches the transcript of a YouTube video."""
+def get_transcript(video_id):
+    """Returns the (cached) transcript, loading the YouTube client library on first use."""
+    import transcript_cache
+
+    return transcript_cache.get_transcript(video_id)
+
+def load_transcript(video_id, compact=True):
+    """Fetches the Transcript of a YouTube video, compacting caption noise unless compact is False; None on failure."""
     try:
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-        text = " ".join([entry['text'] for entry in transcript])
-        return text
+        with metrics.span("fetch_transcript", request_id=video_id, frontend="cli") as span:
+            fetched = get_transcript(video_id)
+            span.record(segments=len(fetched))
+        segments = fetched
+        if compact:
+            with metrics.span("compact_transcript", request_id=video_id, frontend="cli"):
+                segments, stats = compact_segments(fetched)
+            print(f"{video_id}: {format_stats(stats)}", file=sys.stderr)
+        with metrics.span("join_transcript", request_id=video_id, frontend="cli") as span:
+            transcript = Transcript.from_segments(segments, fetched.language)
+            span.record(bytes=len(transcript.text.encode("utf-8")))
+        return transcript
     except Exception as e:
-        print(f"Error fetching transcript: {e}")
+        print(f"Error fetching transcript: {e}", file=sys.stderr)
         return None
 
-def summarize_text(text, prompt_prefix="Summarize the following text: "):
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_transcript_index(video_id, compact=True):
+    """Returns the retrieval index of a video's transcript, built once per (video, compact) and reused by every question.
+
+    Indexes are keyed by the transcript's content too, so a long-lived process
+    (the daemon, the HTTP API) rebuilds one once the cached transcript is refreshed.
+    """
+    transcript = Transcript.from_segments(get_transcript(video_id))
+    key = (video_id, compact, transcript.language, hashlib.sha256(transcript.text.encode("utf-8")).hexdigest())
+    with _indexes_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+    segments = transcript
+    if compact:
+        segments, _ = compact_segments(segments)
+    index = TranscriptIndex.from_segments(Transcript.from_segments(segments))
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+def get_youtube_transcript(video_id, compact=True):
+    """Fetches the transcript text of a YouTube video, compacting caption noise unless compact is False."""
+    transcript = load_transcript(video_id, compact)
+    return transcript.text if transcript is not None else None
+
+def generate_text(model, prompt, stream=False, on_chunk=None, usage=None):
+    """Generates text within the API key's rate limits, printing it to stdout as it arrives when stream is set.
+
+    When on_chunk is given, each chunk is passed to it instead of printed.
+    Throttled (429/503) and transient server errors are retried with backoff.
+    When usage (a TokenUsage) is given, the call's token counts are added to
+    it: Gemini's reported counts when available, else estimates.
+    """
+    import model_registry
+
+    limiter = get_rate_limiter(model_registry.configured_api_key())
+    prompt_tokens = estimate_tokens(prompt)
+    counts = None
+    with metrics.span("generate", frontend="cli") as span:
+        span.record(prompt_bytes=len(prompt.encode("utf-8")), prompt_tokens=prompt_tokens)
+        if on_chunk is not None:
+            text, _ = limiter.call(lambda: generate_streaming(model, prompt, on_chunk), prompt_tokens)
+        elif not stream:
+            response = limiter.call(lambda: model.generate_content(prompt), prompt_tokens)
+            text = response.text
+            counts = getattr(response, "usage_metadata", None)
+        else:
+            text, stats = limiter.call(
+                lambda: generate_streaming(model, prompt, lambda chunk: print(chunk, end="", flush=True)), prompt_tokens)
+            print()
+            if stats["time_to_first_token"] is not None:
+                print(f"(first token after {stats['time_to_first_token']:.2f}s, total {stats['total_time']:.2f}s)",
+                      file=sys.stderr)
+        span.record(output_bytes=len(text.encode("utf-8")))
+    if usage is not None:
+        usage.add(getattr(counts, "prompt_token_count", None) or prompt_tokens,
+                  getattr(counts, "candidates_token_count", None) or estimate_tokens(text))
+    return text
+
+def summarize_text(text, prompt_prefix="Summarize the following text: ", stream=False, on_chunk=None, usage=None):
     """Summarizes text using the Gemini API."""
-    model = genai.GenerativeModel('gemini-1.5-pro')  # Using the newer Gemini 1.5 Pro model
+    model = get_model(MODEL_NAME)
 
-    prompt = prompt_prefix + text
+    with metrics.span("build_prompt", frontend="cli", kind="summary"):
+        prompt = prompt_prefix + text
 
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        # Long transcripts are summarized in parallel chunks, then combined
+        if estimate_tokens(text) > LONG_TRANSCRIPT_TOKENS:
+            chunks = split_segments(segments_from_text(text))
+            partials = summarize_chunks(chunks, lambda chunk_prompt: generate_text(model, chunk_prompt, usage=usage))
+            prompt = prompt_prefix + "(summaries of consecutive parts of the video)\n\n" + join_chunk_summaries(chunks, partials)
+
+        return generate_text(model, prompt, stream, on_chunk, usage)
     except Exception as e:
-        print(f"Error summarizing text: {e}")
+        print(f"Error summarizing text: {e}", file=sys.stderr)
         return None
 
-def ask_question(text, question):
-    """Asks a question about the transcript using the Gemini API."""
-    model = genai.GenerativeModel('gemini-1.5-pro')
+def ask_question(text, question, video_id=None, stream=False, on_chunk=None, usage=None, compact=True):
+    """Asks a question about the transcript using the Gemini API.
+
+    When the video ID is known only the most relevant, timestamped transcript
+    excerpts are sent instead of the whole transcript.
+    """
+    model = get_model(MODEL_NAME)
     
-    prompt = f"Using the following YouTube video transcript, answer this question: {question}\n\nTranscript: {text}"
+    with metrics.span("build_prompt", request_id=video_id, frontend="cli", kind="answer"):
+        if video_id:
+            excerpts = format_context(get_transcript_index(video_id, compact).search(question))
+            prompt = f"Using the following YouTube video transcript excerpts, answer this question and cite the [m:ss] timestamps you rely on: {question}\n\nExcerpts:\n{excerpts}"
+        else:
+            prompt = f"Using the following YouTube video transcript, answer this question: {question}\n\nTranscript: {text}"
     
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        return generate_text(model, prompt, stream, on_chunk, usage)
     except Exception as e:
-        print(f"Error generating answer: {e}")
+        print(f"Error generating answer: {e}", file=sys.stderr)
         return None
 
+def ask_questions(text, questions, video_id=None, usage=None, compact=True):
+    """Answers several questions about the transcript in one Gemini call; returns the answers in order.
+
+    The transcript (or, when the video ID is known, the excerpts relevant to
+    any of the questions) is sent once. Returns None if generation fails.
+    """
+    model = get_model(MODEL_NAME, JSON_GENERATION_CONFIG)
+
+    with metrics.span("build_prompt", request_id=video_id, frontend="cli", kind="answers"):
+        if video_id:
+            context = format_context(get_transcript_index(video_id, compact).search_many(questions))
+        else:
+            context = text
+
+    try:
+        return answer_questions(questions, context, lambda prompt: generate_text(model, prompt, usage=usage),
+                                lambda question: ask_question(text, question, video_id, usage=usage, compact=compact))
+    except Exception as e:
+        print(f"Error generating answers: {e}", file=sys.stderr)
+        return None
+
+def read_questions(args):
+    """Returns the questions given with -q/--question and --questions-file, in order."""
+    questions = list(args.question or [])
+    if args.questions_file:
+        with open(args.questions_file, encoding="utf-8") as f:
+            questions += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return questions
+
 def extract_video_id(url):
     """Extracts the video ID from a YouTube URL."""
-    if "youtube.com/watch?v=" in url:
-        return url.split("youtube.com/watch?v=")[1].split("&")[0]
-    elif "youtu.be/" in url:
-        return url.split("youtu.be/")[1].split("?")[0]
+    with metrics.span("parse_url", frontend="cli"):
+        if "youtube.com/watch?v=" in url:
+            return url.split("youtube.com/watch?v=")[1].split("&")[0]
+        elif "youtu.be/" in url:
+            return url.split("youtu.be/")[1].split("?")[0]
+        else:
+            return url  # Assume it's already a video ID
+
+def expand_stage(source, expander=None):
+    """Expands a playlist or channel URL into its videos; a single video passes through unchanged."""
+    try:
+        yield from expand(source, expander)
+    except Exception as e:
+        print(f"Error expanding {source}: {e}", file=sys.stderr)
+        yield {"video": source, "error": f"Failed to expand playlist or channel: {e}"}
+
+def fetch_stage(video, compact=True, store=None):
+    """Fetches the transcript of one video; returns [(record, transcript or None)]."""
+    if isinstance(video, dict):
+        return [(video, None)]  # Expansion error, passed through to the output
+    video_id = extract_video_id(video)
+    record = {"video": video, "video_id": video_id}
+
+    started = time.perf_counter()
+    transcript = load_transcript(video_id, compact)
+    record["timings"] = {"fetch_seconds": round(time.perf_counter() - started, 3)}
+    if transcript is None or not transcript.text:
+        record["error"] = "Failed to fetch transcript."
+        return [(record, None)]
+    # The language of the transcript actually fetched
+    record["language"] = transcript.language
+    record["transcript_chars"] = len(transcript.text)
+    if store is not None:
+        store.set_state(video_id, TRANSCRIPT_FETCHED)
+    return [(record, transcript.text)]
+
+def generate_stage(item, questions, prompt_prefix, compact=True):
+    """Summarizes (or answers the questions about) one fetched transcript; returns [record]."""
+    record, transcript = item
+    if transcript is None:
+        return [record]
+
+    record["model"] = MODEL_NAME
+    usage = TokenUsage()
+    started = time.perf_counter()
+    try:
+        return [generate_record(record, transcript, questions, prompt_prefix, usage, compact)]
+    finally:
+        record["timings"]["generate_seconds"] = round(time.perf_counter() - started, 3)
+        record["usage"] = usage.to_dict()
+
+def generate_record(record, transcript, questions, prompt_prefix, usage, compact=True):
+    """Adds the summary, the answer or the answers (or the error) to record."""
+    if len(questions) > 1:
+        answers = ask_questions(transcript, questions, record["video_id"], usage, compact)
+        if answers is None:
+            record["error"] = "Failed to generate answers."
+        else:
+            record["answers"] = [{"question": question, "answer": answer} for question, answer in zip(questions, answers)]
+        return record
+
+    question = questions[0] if questions else None
+    if question:
+        result = ask_question(transcript, question, record["video_id"], usage=usage, compact=compact)
     else:
-        return url  # Assume it's already a video ID
+        result = summarize_text(transcript, prompt_prefix, usage=usage)
 
-def main():
-    """Main function to handle command-line arguments and process the video."""
+    if result is None:
+        record["error"] = "Failed to generate an answer." if question else "Failed to generate summary."
+    elif question:
+        record["question"] = question
+        record["answer"] = result
+    else:
+        record["summary"] = result
+    return record
+
+def expand_sources(sources, expander=None):
+    """Yields every video of the given videos, playlists and channels, reporting sources that fail to expand."""
+    for source in sources:
+        for video in expand_stage(source, expander):
+            if not isinstance(video, dict):
+                yield video
+
+def read_videos(source, stdin=None):
+    """Yields video URLs or IDs from a file (or '-' for stdin), skipping blank lines and comments."""
+    stream = (stdin or sys.stdin) if source == "-" else open(source, encoding="utf-8")
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+    finally:
+        if source != "-":
+            stream.close()
+
+class ProgressReporter:
+    """Prints completed and failed counts, throughput and ETA to stderr at most every interval seconds."""
+
+    def __init__(self, total=None, interval=5.0):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.start = self.last_report = time.perf_counter()
+
+    def update(self, record):
+        self.done += 1
+        if "error" in record:
+            self.failed += 1
+        if time.perf_counter() - self.last_report >= self.interval:
+            self.report()
+
+    def report(self):
+        self.last_report = time.perf_counter()
+        rate = self.done / max(self.last_report - self.start, 1e-9)
+        message = f"[progress] {self.done}"
+        if self.total:
+            message += f"/{self.total}"
+        message += f" done ({self.failed} failed), {rate:.2f} videos/s"
+        if self.total and rate:
+            message += f", ETA {(self.total - self.done) / rate:.0f}s"
+        print(message, file=sys.stderr)
+
+def run_batch(videos, questions, prompt_prefix, fetch_workers=8, generate_workers=4, writer=None, compact=True,
+              store=None, progress=None, expander=None, max_attempts=None):
+    """Processes many videos concurrently and writes one record per video as each completes.
+
+    Runs as a staged pipeline: playlist/channel expansion, transcript fetch
+    (fetch_workers threads) and Gemini calls (generate_workers threads), with
+    output on this thread. The stages are joined by bounded queues, so memory
+    stays flat for arbitrarily long inputs and results stream out while
+    playlists are still being listed. With a JobStore, each video's state and
+    result are recorded as it progresses. Records go to writer (see
+    export.py), JSON lines on stdout by default. With a store and
+    max_attempts, a failure that will be retried is not written, so each
+    video's written record is its final outcome.
+    """
+    writer = writer or JSONLWriter(sys.stdout)
+    stages = [
+        (lambda source: expand_stage(source, expander), EXPAND_WORKERS),
+        (lambda video: fetch_stage(video, compact, store), fetch_workers),
+        (lambda item: generate_stage(item, questions, prompt_prefix, compact), generate_workers),
+    ]
+    for record in run_pipeline(videos, stages, queue_size=2 * max(fetch_workers, generate_workers)):
+        retried = False
+        if store is not None and record.get("video_id"):
+            if "error" in record:
+                attempts = store.mark_failed(record["video_id"], record["error"], record)
+                retried = max_attempts is not None and attempts < max_attempts
+            else:
+                store.mark_summarized(record["video_id"], record)
+        if not retried:
+            writer.write(record)
+        if progress is not None:
+            progress.update(record)
+
+def run_jobs(store, questions, prompt_prefix, fetch_workers=8, generate_workers=4, max_attempts=DEFAULT_MAX_ATTEMPTS,
+             compact=True, writer=None, retry_delay=5.0):
+    """Runs every unfinished job in store, retrying failed videos (with a growing delay) until they succeed or hit max_attempts."""
+    attempt = 0
+    while True:
+        jobs = store.runnable(max_attempts)
+        if not jobs:
+            break
+        if attempt:
+            delay = min(retry_delay * 2 ** (attempt - 1), 60)
+            print(f"Retrying {len(jobs)} failed videos in {delay:.0f}s", file=sys.stderr)
+            time.sleep(delay)
+        progress = ProgressReporter(total=len(jobs))
+        run_batch([video for video, _ in jobs], questions, prompt_prefix, fetch_workers, generate_workers, writer, compact,
+                  store=store, progress=progress, max_attempts=max_attempts)
+        progress.report()
+        attempt += 1
+
+    counts = store.counts()
+    print(f"{counts['summarized']}/{counts['total']} videos done, {counts['failed']} failed", file=sys.stderr)
+    for video, error, attempts in store.failures():
+        print(f"  {video}: {error} ({attempts} attempts)", file=sys.stderr)
+
+def build_parser():
+    """Builds the command-line argument parser."""
     parser = argparse.ArgumentParser(description="Summarize YouTube videos using Gemini 1.5 Pro")
-    parser.add_argument("video", help="YouTube video ID or URL")
-    parser.add_argument("-q", "--question", help="Ask a question about the video content")
+    parser.add_argument("video", nargs="?", help="YouTube video ID or URL, or a playlist or channel URL (JSONL output as in batch mode)")
+    parser.add_argument("-q", "--question", action="append",
+                      help="Ask a question about the video content (repeat to answer several in one Gemini call)")
+    parser.add_argument("--questions-file", metavar="FILE",
+                      help="Ask every question listed one per line in FILE, in one Gemini call")
     parser.add_argument("-p", "--prompt", default="Summarize the following YouTube video transcript in detail: ",
                       help="Custom prompt prefix for summarization")
-    
-    args = parser.parse_args()
+    parser.add_argument("-b", "--batch", metavar="FILE",
+                      help="Process many videos, playlists or channels listed one per line in FILE ('-' for stdin), writing JSONL to stdout")
+    parser.add_argument("--fetch-workers", type=int, default=8,
+                      help="Maximum concurrent transcript fetches in batch mode")
+    parser.add_argument("--generate-workers", type=int, default=4,
+                      help="Maximum concurrent Gemini calls in batch mode")
+    parser.add_argument("--jobs", metavar="DB",
+                      help="Record batch progress in the SQLite database DB; re-running with the same DB skips finished videos and retries failed ones")
+    parser.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                      help="Attempts per video before it is left as failed when using --jobs")
+    parser.add_argument("-o", "--output", metavar="FILE",
+                      help="Write one structured record per video to FILE ('-' for stdout), also for a single video; .parquet files are written as Parquet")
+    parser.add_argument("--format", choices=FORMATS,
+                      help="Output format for --output and batch mode (default: from the file extension, else jsonl)")
+    parser.add_argument("--no-compact", action="store_true",
+                      help="Send the transcript verbatim instead of removing caption noise, fillers and repeats")
+    parser.add_argument("--metrics", metavar="FILE",
+                      help="Write per-stage timings to FILE when done (Prometheus text if it ends in .prom, else JSON)")
+    parser.add_argument("-s", "--stream", action="store_true",
+                      help="Print the summary or answer incrementally as it is generated")
+    parser.add_argument("--daemon", action="store_true",
+                      help="Run as a long-lived daemon that later invocations forward their requests to")
+    parser.add_argument("--no-daemon", action="store_true",
+                      help="Run in this process even if a daemon is listening")
+    parser.add_argument("--socket", default=None,
+                      help="Unix socket of the daemon (default $YT_SUMMARIZER_SOCKET or ~/.cache/yt_summarizer/cli.sock)")
+    return parser
+
+def main(argv=None):
+    """Main function to handle command-line arguments and process the video."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.daemon or not args.no_daemon:
+        import cli_daemon
+
+        socket_path = args.socket or cli_daemon.DEFAULT_SOCKET_PATH
+        if args.daemon:
+            # Load the client libraries and configure the API up front so the first request is warm
+            get_model(MODEL_NAME)
+            import transcript_cache
+            cli_daemon.serve(run_request, socket_path)
+            return
+        code = cli_daemon.forward(argv, socket_path, sys.stdin if args.batch == "-" else None)
+        if code is not None:
+            if code:
+                sys.exit(code)
+            return
+
+    execute(args, parser)
+
+def run_request(argv, cwd=None, stdin=None):
+    """Runs one command line forwarded to the daemon, with paths relative to the client's working directory."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.daemon:
+        parser.error("--daemon cannot be forwarded to a running daemon")
+    if cwd:
+        if args.batch and args.batch != "-":
+            args.batch = os.path.join(cwd, args.batch)
+        if args.metrics:
+            args.metrics = os.path.join(cwd, args.metrics)
+        if args.jobs:
+            args.jobs = os.path.join(cwd, args.jobs)
+        if args.output and args.output != "-":
+            args.output = os.path.join(cwd, args.output)
+        if args.questions_file:
+            args.questions_file = os.path.join(cwd, args.questions_file)
+    execute(args, parser, io.StringIO(stdin) if stdin is not None else None)
+
+def execute(args, parser, stdin=None):
+    """Runs parsed command-line arguments and writes the --metrics file."""
+    try:
+        run(args, parser, stdin)
+    finally:
+        if args.metrics:
+            with open(args.metrics, "w", encoding="utf-8") as f:
+                f.write(metrics.metrics.to_prometheus() if args.metrics.endswith(".prom")
+                        else metrics.metrics.to_json(include_recent=True))
+
+def run(args, parser, stdin=None):
+    """Runs batch mode or the single-video flow for parsed command-line arguments."""
+    if resolve_format(args.output, args.format) == "parquet" and (not args.output or args.output == "-"):
+        # Checked up front: with --jobs the file is only written once every video is done
+        parser.error("Parquet output needs an output file: add -o FILE.parquet")
+    questions = read_questions(args)
+    if args.jobs:
+        store = JobStore(args.jobs)
+        if args.batch:
+            # Every video is recorded before any is processed, so playlists are fully listed up front here
+            added = store.add((video, extract_video_id(video)) for video in expand_sources(read_videos(args.batch, stdin)))
+            print(f"Added {added} new videos to {args.jobs}", file=sys.stderr)
+        if resolve_format(args.output, args.format) == "parquet":
+            # Parquet cannot be appended to, so the file is rewritten from every finished job in the store
+            run_jobs(store, questions, args.prompt, args.fetch_workers, args.generate_workers, args.max_attempts,
+                     compact=not args.no_compact, writer=NullWriter())
+            write_records(args.output, store.results(include_failed=True), "parquet")
+            return
+        # A resumed run adds its records to the JSONL file of the earlier runs
+        with open_writer(args.output, args.format, append=True) as writer:
+            run_jobs(store, questions, args.prompt, args.fetch_workers, args.generate_workers, args.max_attempts,
+                     compact=not args.no_compact, writer=writer)
+        return
+    if args.batch:
+        with open_writer(args.output, args.format) as writer:
+            run_batch(read_videos(args.batch, stdin), questions, args.prompt, args.fetch_workers,
+                      args.generate_workers, writer, compact=not args.no_compact)
+        return
+    if not args.video:
+        parser.error("a video ID or URL is required unless --batch or --jobs is given")
+    if args.output or args.format or is_collection_url(args.video):
+        # Structured output, and every video of a playlist or channel, go through batch mode
+        with open_writer(args.output, args.format) as writer:
+            run_batch([args.video], questions, args.prompt, args.fetch_workers, args.generate_workers, writer,
+                      compact=not args.no_compact)
+        return
     
     # Extract video ID if a URL was provided
     video_id = extract_video_id(args.video)
     
     print(f"Fetching transcript for video ID: {video_id}")
-    transcript = get_youtube_transcript(video_id)
+    transcript = get_youtube_transcript(video_id, compact=not args.no_compact)
 
     if transcript:
         print("Transcript fetched successfully.")
         
+        # If several questions were provided, answer them together
+        if len(questions) > 1:
+            print(f"\nGenerating answers to {len(questions)} questions...")
+            answers = ask_questions(transcript, questions, video_id, compact=not args.no_compact)
+            if answers:
+                for question, answer in zip(questions, answers):
+                    print(f"\nQuestion: {question}")
+                    print(f"Answer: {answer}")
+            else:
+                print("Failed to generate answers.")
         # If a question was provided, answer it
-        if args.question:
-            print(f"\nQuestion: {args.question}")
+        elif questions:
+            print(f"\nQuestion: {questions[0]}")
             print("\nGenerating answer...")
-            answer = ask_question(transcript, args.question)
-            if answer:
+            if args.stream:
                 print("\nAnswer:")
-                print(answer)
+            answer = ask_question(transcript, questions[0], video_id, stream=args.stream, compact=not args.no_compact)
+            if answer:
+                if not args.stream:
+                    print("\nAnswer:")
+                    print(answer)
             else:
                 print("Failed to generate an answer.")
         # Otherwise, summarize the transcript
         else:
             print("Generating summary...")
-            summary = summarize_text(transcript, args.prompt)
-            if summary:
+            if args.stream:
                 print("\nSummary:")
-                print(summary)
+            summary = summarize_text(transcript, args.prompt, stream=args.stream)
+            if summary:
+                if not args.stream:
+                    print("\nSummary:")
+                    print(summary)
             else:
                 print("Failed to generate summary.")
     else:
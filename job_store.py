@@ -0,0 +1,128 @@
+"""Persistent, resumable job state for large batch runs.
+
+Each video in a batch gets one row in a SQLite database recording how far it
+got: pending, transcript fetched, summarized, or failed (with the reason and
+the number of attempts). Re-running the same batch against the same database
+skips videos that are already summarized and retries failed ones until they
+reach the attempt cap, so a crash or a burst of transient errors partway
+through a run of thousands of videos costs only the unfinished work.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+PENDING = "pending"
+TRANSCRIPT_FETCHED = "transcript_fetched"
+SUMMARIZED = "summarized"
+FAILED = "failed"
+DEFAULT_MAX_ATTEMPTS = 3
+
+
+class JobStore:
+    """SQLite-backed per-video job state, safe to update from worker threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    video_id TEXT PRIMARY KEY,
+                    video TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result TEXT,
+                    position INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state)")
+
+    def add(self, videos):
+        """Adds (video, video_id) pairs as pending jobs, ignoring videos already in the store; returns how many were new."""
+        now = time.time()
+        with self._lock, self._conn:
+            position = self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM jobs").fetchone()[0]
+            before = self._conn.total_changes
+            for video, video_id in videos:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO jobs (video_id, video, state, position, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (video_id, video, PENDING, position, now),
+                )
+                position += cursor.rowcount
+            return self._conn.total_changes - before
+
+    def runnable(self, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """Returns (video, video_id) for unfinished jobs, and failed ones below max_attempts, in insertion order."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT video, video_id FROM jobs WHERE state != ? AND (state != ? OR attempts < ?) ORDER BY position",
+                (SUMMARIZED, FAILED, max_attempts),
+            ).fetchall()
+
+    def set_state(self, video_id, state):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET state = ?, updated_at = ? WHERE video_id = ?",
+                               (state, time.time(), video_id))
+
+    def mark_summarized(self, video_id, record):
+        """Stores the finished result record for a video."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, error = NULL, result = ?, updated_at = ? WHERE video_id = ?",
+                (SUMMARIZED, json.dumps(record, ensure_ascii=False), time.time(), video_id),
+            )
+
+    def mark_failed(self, video_id, error, record=None):
+        """Records a failed attempt, its reason and optionally its record; returns the attempts made so far."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, error = ?, result = ?, updated_at = ? WHERE video_id = ?",
+                (FAILED, error, json.dumps(record, ensure_ascii=False) if record is not None else None, time.time(),
+                 video_id),
+            )
+            row = self._conn.execute("SELECT attempts FROM jobs WHERE video_id = ?", (video_id,)).fetchone()
+        return row[0] if row else 0
+
+    def counts(self):
+        """Returns the number of jobs in each state, plus the total."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = {PENDING: 0, TRANSCRIPT_FETCHED: 0, SUMMARIZED: 0, FAILED: 0}
+        counts.update(rows)
+        counts["total"] = sum(count for _, count in rows)
+        return counts
+
+    def results(self, include_failed=False, page_size=500):
+        """Yields the stored record of every summarized video (and failed one), in insertion order.
+
+        Rows are read a page at a time, so the whole result set is never in
+        memory. Failed videos without a stored record get a minimal one.
+        """
+        states = (SUMMARIZED, FAILED) if include_failed else (SUMMARIZED,)
+        position = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT position, video, video_id, error, result FROM jobs "
+                    f"WHERE state IN ({','.join('?' * len(states))}) AND position > ? ORDER BY position LIMIT ?",
+                    (*states, position, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for position, video, video_id, error, result in rows:
+                yield json.loads(result) if result else {"video": video, "video_id": video_id, "error": error}
+
+    def failures(self):
+        """Returns (video, error, attempts) for every failed video."""
+        with self._lock:
+            return self._conn.execute("SELECT video, error, attempts FROM jobs WHERE state = ? ORDER BY position",
+                                      (FAILED,)).fetchall()
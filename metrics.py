@@ -0,0 +1,200 @@
+"""Per-stage timing spans and metrics export.
+
+Wrap each pipeline stage in ``span("stage_name", frontend="app")``; the
+elapsed time and any sizes recorded on the span (bytes, tokens) are kept for
+recent requests and aggregated per stage. The front-ends use the stages
+parse_url, fetch_transcript, fetch_translations, compact_transcript, join_transcript,
+cache_context, build_prompt and generate. Aggregates are exported as
+Prometheus text or JSON, and a small HTTP endpoint can serve them for
+scraping.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RECENT_SPANS = 200
+
+
+class _Span:
+    def __init__(self, stage, request_id, labels):
+        self.stage = stage
+        self.request_id = request_id
+        self.labels = labels
+        self.sizes = {}
+        self.duration = None
+        self.error = None
+
+    def record(self, **sizes):
+        """Records sizes for this span, such as bytes=... or tokens=..."""
+        self.sizes.update(sizes)
+
+
+class _StageStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.sizes = {}
+
+
+class Metrics:
+    """Thread-safe registry of span timings, aggregated per (stage, labels)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self.recent = deque(maxlen=RECENT_SPANS)
+
+    @contextmanager
+    def span(self, stage, request_id=None, **labels):
+        """Times the enclosed block as one occurrence of stage; yields the span to record sizes on.
+
+        labels become aggregation (and Prometheus) labels, so keep them low
+        cardinality; request_id (e.g. the video ID) only tags the recent-span log.
+        """
+        current = _Span(stage, request_id, labels)
+        start = time.perf_counter()
+        try:
+            yield current
+        except BaseException as e:
+            current.error = type(e).__name__
+            raise
+        finally:
+            current.duration = time.perf_counter() - start
+            self._observe(current)
+
+    def _observe(self, current):
+        key = (current.stage, tuple(sorted(current.labels.items())))
+        with self._lock:
+            stats = self._stages.get(key)
+            if stats is None:
+                stats = self._stages[key] = _StageStats()
+            stats.count += 1
+            stats.total_seconds += current.duration
+            stats.max_seconds = max(stats.max_seconds, current.duration)
+            if current.error:
+                stats.errors += 1
+            for index, bound in enumerate(BUCKETS):
+                if current.duration <= bound:
+                    stats.buckets[index] += 1
+            for name, value in current.sizes.items():
+                stats.sizes[name] = stats.sizes.get(name, 0) + value
+            self.recent.append({
+                "stage": current.stage,
+                "request_id": current.request_id,
+                "labels": current.labels,
+                "seconds": current.duration,
+                "sizes": current.sizes,
+                "error": current.error,
+                "time": time.time(),
+            })
+
+    def snapshot(self):
+        """Returns per-stage aggregates as a list of dicts."""
+        with self._lock:
+            return [
+                {
+                    "stage": stage,
+                    "labels": dict(labels),
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "total_seconds": stats.total_seconds,
+                    "mean_seconds": stats.total_seconds / stats.count,
+                    "max_seconds": stats.max_seconds,
+                    "sizes": dict(stats.sizes),
+                }
+                for (stage, labels), stats in sorted(self._stages.items())
+            ]
+
+    def to_json(self, include_recent=False):
+        """Dumps the aggregates (and optionally the most recent spans) as JSON."""
+        data = {"stages": self.snapshot()}
+        if include_recent:
+            with self._lock:
+                data["recent"] = list(self.recent)
+        return json.dumps(data, indent=2)
+
+    def to_prometheus(self):
+        """Renders the aggregates in the Prometheus text exposition format."""
+        histogram = [
+            "# HELP yt_summarizer_stage_seconds Time spent in each pipeline stage.",
+            "# TYPE yt_summarizer_stage_seconds histogram",
+        ]
+        errors = [
+            "# HELP yt_summarizer_stage_errors_total Stage executions that raised.",
+            "# TYPE yt_summarizer_stage_errors_total counter",
+        ]
+        # Size counters are named after what the stages record (bytes, tokens, ...)
+        sizes = {}
+        with self._lock:
+            for (stage, labels), stats in sorted(self._stages.items()):
+                labels = {"stage": stage, **dict(labels)}
+                base = _format_labels(labels)
+                for bound, count in zip(BUCKETS, stats.buckets):
+                    histogram.append(f"yt_summarizer_stage_seconds_bucket{_format_labels({**labels, 'le': bound})} {count}")
+                histogram.append(f"yt_summarizer_stage_seconds_bucket{_format_labels({**labels, 'le': '+Inf'})} {stats.count}")
+                histogram.append(f"yt_summarizer_stage_seconds_sum{base} {stats.total_seconds}")
+                histogram.append(f"yt_summarizer_stage_seconds_count{base} {stats.count}")
+                errors.append(f"yt_summarizer_stage_errors_total{base} {stats.errors}")
+                for name, value in stats.sizes.items():
+                    sizes.setdefault(f"yt_summarizer_stage_{name}_total", []).append(f"{base} {value}")
+
+        lines = histogram + errors
+        for name, samples in sorted(sizes.items()):
+            lines.append(f"# TYPE {name} counter")
+            lines += [name + sample for sample in samples]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Discards all recorded spans."""
+        with self._lock:
+            self._stages.clear()
+            self.recent.clear()
+
+
+def _format_labels(labels):
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# Process-wide registry used by the front-ends
+metrics = Metrics()
+span = metrics.span
+
+
+def start_http_server(port, host="127.0.0.1", registry=metrics):
+    """Serves /metrics (Prometheus text) and /metrics.json on a background thread; returns the server."""
+    # Imported here so front-ends that never serve metrics don't pay for http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = registry.to_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = registry.to_json(include_recent=True), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,47 @@
+"""Process-wide registry of configured Gemini model clients.
+
+``genai.configure`` and ``genai.GenerativeModel(...)`` used to run on every
+call (and on every Streamlit rerun), throwing away the underlying client and
+its connection each time. The registry configures the API once per key and
+builds one model per (model name, generation config), so every caller in the
+process shares the same warm client.
+"""
+import json
+import threading
+
+import google.generativeai as genai
+
+_lock = threading.Lock()
+_configured_key = None
+_models = {}
+
+
+def configure(api_key):
+    """Configures the Gemini API, doing nothing if it is already configured with this key."""
+    global _configured_key
+    with _lock:
+        if api_key == _configured_key:
+            return
+        genai.configure(api_key=api_key)
+        _configured_key = api_key
+        # Models built for the previous key hold stale clients
+        _models.clear()
+
+
+def configured_api_key():
+    """Returns the API key the registry was last configured with."""
+    return _configured_key
+
+
+def get_model(model_name, generation_config=None, **kwargs):
+    """Returns the shared GenerativeModel for model_name and generation_config, building it once."""
+    key = (model_name, json.dumps(generation_config, sort_keys=True, default=str),
+           json.dumps(kwargs, sort_keys=True, default=str))
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                model = genai.GenerativeModel(model_name, generation_config=generation_config, **kwargs)
+                _models[key] = model
+    return model
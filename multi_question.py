@@ -0,0 +1,78 @@
+"""Answering several questions about one video in a single model call.
+
+All questions go into one prompt that asks for a JSON list of numbered
+answers, so N questions cost one transcript upload instead of N. If the
+response is not a well-formed answer set, the batch is split in half and
+each half is retried, down to single questions, which are answered with the
+caller's regular one-question path.
+"""
+import json
+import re
+
+MULTI_QUESTION_PROMPT = """Use the following YouTube video transcript to answer each of the numbered questions below.
+Respond with only a JSON object of the form {{"answers": [{{"question": <number>, "answer": "<answer>"}}, ...]}}
+containing exactly one answer per question, in order.
+
+Questions:
+{questions}
+
+Transcript:
+{context}"""
+
+# Asks Gemini for JSON output directly, so responses rarely need repair
+JSON_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def build_prompt(questions, context):
+    """Builds the structured prompt for a list of questions about context."""
+    numbered = "\n".join(f"{number}. {question}" for number, question in enumerate(questions, 1))
+    return MULTI_QUESTION_PROMPT.format(questions=numbered, context=context)
+
+
+def parse_answers(text, count):
+    """Parses a structured response into a list of count answers, or returns None if it is malformed."""
+    try:
+        data = json.loads(_FENCE_RE.sub("", text.strip()))
+    except (TypeError, ValueError):
+        return None
+    if isinstance(data, dict):
+        data = data.get("answers")
+    if not isinstance(data, list) or len(data) != count:
+        return None
+
+    answers = [None] * count
+    for position, item in enumerate(data):
+        if isinstance(item, str):
+            number, answer = position + 1, item
+        elif isinstance(item, dict):
+            number, answer = item.get("question", position + 1), item.get("answer")
+        else:
+            return None
+        if not isinstance(number, int) or not 1 <= number <= count or not isinstance(answer, str):
+            return None
+        answers[number - 1] = answer.strip()
+    if any(answer is None for answer in answers):
+        return None
+    return answers
+
+
+def answer_questions(questions, context, generate, answer_one):
+    """Answers questions about context with as few generate(prompt) calls as possible.
+
+    generate(prompt) returns the model's raw text; answer_one(question)
+    answers a single question the regular way and is used once splitting
+    reaches one question. Returns the answers in question order.
+    """
+    questions = list(questions)
+    if len(questions) == 1:
+        return [answer_one(questions[0])]
+
+    answers = parse_answers(generate(build_prompt(questions, context)), len(questions))
+    if answers is not None:
+        return answers
+
+    middle = len(questions) // 2
+    return (answer_questions(questions[:middle], context, generate, answer_one)
+            + answer_questions(questions[middle:], context, generate, answer_one))
@@ -3,24 +3,36 @@ from dotenv import load_dotenv
 
 load_dotenv() ##load all the nevironment variables
 import os
-import google.generativeai as genai
+import model_registry
 
-from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+from transcript import Transcript
+from transcript_cache import get_preferred_transcript, get_translations, list_transcripts
+from transcript_index import TranscriptIndex, format_context
+from transcript_compaction import compact_segments
+from transcript_store import TranscriptStore
+import metrics
 
 # Configure Google Gemini API using Streamlit Secrets
-#genai.configure(api_key=st.secrets["GOOGLE_API_KEY"])
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+#model_registry.configure(st.secrets["GOOGLE_API_KEY"])
+model_registry.configure(os.getenv("GOOGLE_API_KEY"))
 
 # Function to get YouTube video ID
 def get_video_id(youtube_video_url):
     return youtube_video_url.split("=")[1]
 
 # Function to check available languages for a video's transcript
+# The listing is cached, so fetching the transcript afterwards reuses it
 def list_available_transcripts(video_id):
     try:
-        transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
-        available_languages = [trans.language_code for trans in transcripts]
+        transcripts = list_transcripts(video_id)
+        available_languages = [
+            f"{trans.language_code} (auto-generated)" if trans.is_generated else trans.language_code
+            for trans in transcripts
+        ]
+        st.session_state['translation_languages'] = sorted(
+            {language['language_code'] for trans in transcripts for language in trans.translation_languages}
+        )
         return available_languages
     except TranscriptsDisabled:
         st.error("Transcripts are disabled for this video.")
@@ -33,26 +45,37 @@ def list_available_transcripts(video_id):
         return []
 
 ## getting the transcript data from yt videos
-def extract_transcript_details(youtube_video_url):
+def extract_transcript_details(youtube_video_url, languages=None):
     try:
-        video_id=youtube_video_url.split("=")[1]
-        transcript_text=YouTubeTranscriptApi.get_transcript(video_id)
-
-        transcript = " ".join([i["text"] for i in transcript_text])
-        # transcript = ""
-        # for i in transcript_text:
-        #     transcript += " " + i["text"]
-
-        return transcript
+        with metrics.span("parse_url", frontend="multilang"):
+            video_id=youtube_video_url.split("=")[1]
+        with metrics.span("fetch_transcript", request_id=video_id, frontend="multilang"):
+            transcript_text = get_preferred_transcript(video_id, languages)
+        return join_transcript(transcript_text, video_id)
 
     except Exception as e:
         raise e
+
+# Compacts transcript segments and joins them into the prompt text
+def join_transcript(transcript_text, video_id=None):
+    with metrics.span("compact_transcript", request_id=video_id, frontend="multilang"):
+        transcript_text, _ = compact_segments(transcript_text)
+
+    with metrics.span("join_transcript", request_id=video_id, frontend="multilang") as span:
+        transcript = Transcript.from_segments(transcript_text).text
+        span.record(bytes=len(transcript.encode("utf-8")))
+    # transcript = ""
+    # for i in transcript_text:
+    #     transcript += " " + i["text"]
+
+    return transcript
     
 ## getting the summary based on Prompt from Google Gemini Pro
 def generate_gemini_content(transcript_text,prompt):
 
-    model=genai.GenerativeModel("gemini-pro")
-    response=model.generate_content(prompt+transcript_text)
+    model=model_registry.get_model("gemini-pro")
+    with metrics.span("generate", frontend="multilang", kind="summary"):
+        response=model.generate_content(prompt+transcript_text)
     candidate = response.candidates[0]
     parts = candidate.content.parts
     summary = ""
@@ -62,11 +85,29 @@ def generate_gemini_content(transcript_text,prompt):
 
     return summary
 
-# Function to answer questions based on the transcript
-def answer_question(transcript_text, question):
-    prompt = f"Use the transcript to answer this question:\n\n{question}\n\nTranscript:\n{transcript_text}\n"
-    model = genai.GenerativeModel("gemini-pro")
-    response = model.generate_content(prompt)
+# One copy of each transcript for the whole process; sessions hold only refs to them
+@st.cache_resource
+def get_transcript_store():
+    return TranscriptStore()
+
+# Built once per video and kept in the shared store, under its memory cap
+def get_transcript_index(video_id, languages=None):
+    def build():
+        segments, _ = compact_segments(get_preferred_transcript(video_id, languages))
+        return TranscriptIndex.from_segments(Transcript.from_segments(segments))
+
+    return get_transcript_store().get(("index", video_id, languages), build)
+
+# Function to answer questions based on the most relevant transcript excerpts
+def answer_question(transcript_text, question, video_id=None, languages=None):
+    if video_id:
+        excerpts = format_context(get_transcript_index(video_id, languages).search(question))
+        prompt = f"Use these transcript excerpts to answer this question, citing their [m:ss] timestamps:\n\n{question}\n\nExcerpts:\n{excerpts}\n"
+    else:
+        prompt = f"Use the transcript to answer this question:\n\n{question}\n\nTranscript:\n{transcript_text}\n"
+    model = model_registry.get_model("gemini-pro")
+    with metrics.span("generate", request_id=video_id, frontend="multilang", kind="answer"):
+        response = model.generate_content(prompt)
     answer = response.candidates[0].content.parts[0].text  # Extract answer text
     return answer
 
@@ -88,18 +129,25 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Initialize session states
-if 'transcript_text' not in st.session_state:
-    st.session_state['transcript_text'] = ""
+if 'transcript_ref' not in st.session_state:
+    st.session_state['transcript_ref'] = None
 if 'summary' not in st.session_state:
     st.session_state['summary'] = ""
 if 'youtube_link' not in st.session_state:
     st.session_state['youtube_link'] = ""
 if 'video_id' not in st.session_state:
     st.session_state['video_id'] = ""
+if 'translation_languages' not in st.session_state:
+    st.session_state['translation_languages'] = []
+if 'translated_summaries' not in st.session_state:
+    st.session_state['translated_summaries'] = {}
 
 st.title("YouTube Video Summarizer and Q&A")
 
 youtube_link = st.text_input("Enter YouTube Video Link:")
+preferred_languages = st.text_input("Preferred transcript languages (in order):", value="en",
+                                    help="Comma-separated language codes; manual transcripts are preferred over auto-generated ones")
+preferred_languages = tuple(code.strip() for code in preferred_languages.split(",") if code.strip()) or None
 
 # Button to check available transcription languages
 if st.button("Check Available Transcriptions"):
@@ -113,23 +161,50 @@ if st.button("Check Available Transcriptions"):
         st.write("No transcriptions available for this video.")
 
 word_count = st.number_input("Enter the desired number of words for the summary:", min_value=50, max_value=1000, value=250)
+output_languages = st.multiselect("Also write notes in (from translated transcripts):",
+                                  st.session_state['translation_languages'],
+                                  help="Run \"Check Available Transcriptions\" to list the translation languages")
 
 # Video width slider
 st.sidebar.header("Video Settings")
 video_width_percentage = st.sidebar.slider("Video Width (%)", min_value=10, max_value=100, value=80)
+store_stats = get_transcript_store().stats()
+st.sidebar.caption(f"Shared transcripts and indexes: {store_stats['entries']} entries, {store_stats['bytes'] / 2**20:.1f} of {store_stats['max_bytes'] / 2**20:.0f} MB, {store_stats['refs']} session refs")
 
 if st.button("Get Detailed Notes"):
     st.session_state['youtube_link'] = youtube_link
     st.session_state['video_id'] = get_video_id(youtube_link)
-    st.session_state['transcript_text'] = extract_transcript_details(youtube_link)
-
-    if st.session_state['transcript_text']:
+    transcript_text = extract_transcript_details(youtube_link, preferred_languages)
+    st.session_state['translated_summaries'] = {}
+
+    # Sessions on the same video share one stored copy; an evicted one is rebuilt from the transcript cache
+    previous_ref = st.session_state['transcript_ref']
+    st.session_state['transcript_ref'] = get_transcript_store().ref(
+        ("transcript", st.session_state['video_id'], preferred_languages),
+        lambda link=youtube_link, languages=preferred_languages: extract_transcript_details(link, languages),
+        transcript_text)
+    if previous_ref is not None:
+        previous_ref.release()
+
+    if transcript_text:
         # Adjust the prompt to include the word count entered by the user
         prompt = f"""You are a YouTube video summarizer. You will be taking the transcript text
         and summarizing the entire video and providing the important summary in points
         within {word_count} words. Please provide the summary of the text given here: """
 
-        st.session_state['summary']=generate_gemini_content(st.session_state['transcript_text'],prompt)
+        st.session_state['summary']=generate_gemini_content(transcript_text,prompt)
+
+        if output_languages:
+            # All requested translations are fetched in parallel from the cached listing
+            with metrics.span("fetch_translations", request_id=st.session_state['video_id'], frontend="multilang"):
+                translations = get_translations(st.session_state['video_id'], output_languages, preferred_languages)
+            for language, translated in translations.items():
+                translated_prompt = f"""You are a YouTube video summarizer. You will be taking the transcript text
+                and summarizing the entire video and providing the important summary in points
+                within {word_count} words, written in the language with code "{language}".
+                Please provide the summary of the text given here: """
+                st.session_state['translated_summaries'][language] = generate_gemini_content(
+                    join_transcript(translated, st.session_state['video_id']), translated_prompt)
 
 # Display video in a centered container with adjustable width
 if st.session_state['video_id']:
@@ -142,14 +217,19 @@ if st.session_state['video_id']:
 if st.session_state['summary']:
     st.markdown("## Detailed Notes:")
     st.write(st.session_state['summary'])
+    for language, translated_summary in st.session_state['translated_summaries'].items():
+        st.markdown(f"### Notes ({language}):")
+        st.write(translated_summary)
 
 # Q&A Section
-if st.session_state['transcript_text']:
+transcript_text = st.session_state['transcript_ref'].get() if st.session_state['transcript_ref'] is not None else ""
+if transcript_text:
     st.markdown("## Ask a Question about the Video")
     question = st.text_input("Enter your question:")
 
     # Handle question submission
     if question:
-        answer = answer_question(st.session_state['transcript_text'], question)
+        answer = answer_question(transcript_text, question, st.session_state['video_id'],
+                                 preferred_languages)
         st.markdown("### Answer:")
         st.write(answer)
@@ -21,10 +21,7 @@ def extract_transcript_details(youtube_video_url):
         video_id=youtube_video_url.split("=")[1]
         transcript_text=YouTubeTranscriptApi.get_transcript(video_id)
 
-        #transcript = " ".join([i["text"] for i in transcript_text])
-        transcript = ""
-        for i in transcript_text:
-             transcript += " " + i["text"]
+        transcript = " ".join([i["text"] for i in transcript_text])
         return transcript
     
     except _errors.TranscriptsDisabled:
@@ -0,0 +1,135 @@
+"""Staged producer-consumer pipeline over bounded queues.
+
+Each stage is a function run by its own pool of worker threads. A stage takes
+one item and returns (or yields) any number of items for the next stage, so a
+stage can expand one input into many (a playlist into its videos) or pass
+items through one-to-one. Stages are connected by bounded queues: a slow
+stage makes the ones before it block instead of buffering everything, so
+memory stays flat however long the input is, and the first results come out
+while the first stage is still producing.
+
+If the consumer stops early (breaks out of the loop, raises, or closes the
+generator), the pipeline is stopped: worker threads finish the item they are
+on, discard their output and exit instead of blocking on a full queue, so
+long-lived processes (the CLI daemon, the HTTP API) do not leak them.
+"""
+import queue
+import threading
+
+DEFAULT_QUEUE_SIZE = 16
+POLL_INTERVAL = 0.1  # how often blocked threads check whether the pipeline was stopped
+
+_DONE = object()
+
+
+class _Failure:
+    """An exception raised in a stage, passed downstream and re-raised by the consumer."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class _Stopped(Exception):
+    pass
+
+
+def _put(output, item, stop):
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            output.put(item, timeout=POLL_INTERVAL)
+            return
+        except queue.Full:
+            pass
+
+
+def _get(input_queue, stop):
+    while True:
+        if stop.is_set():
+            raise _Stopped()
+        try:
+            return input_queue.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            pass
+
+
+def _feed(items, output, stop):
+    try:
+        try:
+            for item in items:
+                _put(output, item, stop)
+        except _Stopped:
+            raise
+        except Exception as e:
+            _put(output, _Failure(e), stop)
+        _put(output, _DONE, stop)
+    except _Stopped:
+        pass
+
+
+def _start_stage(function, workers, input_queue, output_queue, stop):
+    remaining = [workers]
+    lock = threading.Lock()
+
+    def work():
+        try:
+            while True:
+                item = _get(input_queue, stop)
+                if item is _DONE:
+                    # Let the other workers of this stage see the end too
+                    _put(input_queue, _DONE, stop)
+                    break
+                if isinstance(item, _Failure):
+                    _put(output_queue, item, stop)
+                    continue
+                try:
+                    for result in function(item):
+                        _put(output_queue, result, stop)
+                except _Stopped:
+                    raise
+                except Exception as e:
+                    _put(output_queue, _Failure(e), stop)
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                _put(output_queue, _DONE, stop)
+        except _Stopped:
+            pass
+
+    for _ in range(workers):
+        threading.Thread(target=work, daemon=True).start()
+
+
+def run_pipeline(items, stages, queue_size=DEFAULT_QUEUE_SIZE):
+    """Streams items through stages, yielding the last stage's outputs as they are produced.
+
+    stages is a list of (function, workers) pairs; function(item) returns an
+    iterable of items for the next stage. An exception raised by a stage is
+    re-raised here when it reaches the end of the pipeline. Closing the
+    generator before the end stops every stage.
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    stop = threading.Event()
+    threading.Thread(target=_feed, args=(items, queues[0], stop), daemon=True).start()
+    for (function, workers), input_queue, output_queue in zip(stages, queues, queues[1:]):
+        _start_stage(function, workers, input_queue, output_queue, stop)
+
+    try:
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        # Drop whatever is still buffered so it can be freed while the workers wind down
+        for pending in queues:
+            try:
+                while True:
+                    pending.get_nowait()
+            except queue.Empty:
+                pass
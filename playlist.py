@@ -0,0 +1,94 @@
+"""Expansion of playlist and channel URLs into the videos they contain.
+
+``expand(source)`` yields single-video URLs and IDs unchanged and expands
+playlist (``?list=``) and channel (``/@handle``, ``/channel/``, ``/c/``,
+``/user/``) URLs into video IDs, lazily page by page, so consumers can start
+on the first videos while the listing is still being fetched.
+
+Expanders are pluggable; ``PLAYLIST_EXPANDER`` selects one:
+    ytdlp  lists videos with yt-dlp (``pip install yt-dlp``; default)
+    local  serves listings from a JSON file named by ``PLAYLIST_LISTINGS``,
+           mapping collection URLs to lists of video IDs, for tests and offline runs
+"""
+import json
+import os
+import re
+from urllib.parse import parse_qs, urlparse
+
+COLLECTION_PATH_RE = re.compile(r"^/(playlist|channel/[^/]+|c/[^/]+|user/[^/]+|@[^/]+)(/.*)?$")
+
+
+def is_collection_url(url):
+    """Returns True for playlist and channel URLs, False for single videos and bare IDs."""
+    parsed = urlparse(url)
+    if "youtube.com" not in parsed.netloc:
+        return False
+    if parsed.path == "/watch":
+        # A video watched within a playlist is still a single video
+        return False
+    return "list" in parse_qs(parsed.query) or bool(COLLECTION_PATH_RE.match(parsed.path))
+
+
+class YtDlpExpander:
+    """Lists playlist and channel videos with yt-dlp, without downloading anything."""
+
+    def expand(self, url):
+        try:
+            import yt_dlp
+        except ImportError:
+            raise RuntimeError("Expanding playlist and channel URLs requires yt-dlp: pip install yt-dlp")
+
+        parsed = urlparse(url)
+        if not parsed.path.startswith("/playlist") and not re.search(r"/(videos|shorts|streams)/?$", parsed.path):
+            # A bare channel URL lists its tabs; list the uploads tab instead
+            url = url.rstrip("/") + "/videos"
+        options = {"extract_flat": "in_playlist", "lazy_playlist": True, "quiet": True, "no_warnings": True}
+        with yt_dlp.YoutubeDL(options) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            yield from self._video_ids(ydl, info)
+
+    def _video_ids(self, ydl, info):
+        for entry in info.get("entries") or ():
+            if entry.get("ie_key") == "YoutubeTab" or entry.get("_type") == "playlist":
+                # Nested tab or playlist; entries of a flat listing are only references
+                nested = entry if entry.get("entries") is not None else ydl.extract_info(
+                    entry["url"], download=False, process=False)
+                yield from self._video_ids(ydl, nested)
+            elif entry.get("id"):
+                yield entry["id"]
+
+
+class LocalExpander:
+    """Serves listings from a dict (or JSON file) of collection URL -> video IDs."""
+
+    def __init__(self, listings=None, path=None):
+        if listings is None:
+            path = path or os.getenv("PLAYLIST_LISTINGS")
+            if not path:
+                raise ValueError("Set PLAYLIST_LISTINGS to a JSON file of playlist listings for the local expander")
+            with open(path, encoding="utf-8") as f:
+                listings = json.load(f)
+        self.listings = listings
+
+    def expand(self, url):
+        if url not in self.listings:
+            raise KeyError(f"No local listing for {url}")
+        yield from self.listings[url]
+
+
+def create_expander(name=None):
+    """Creates the expander named by ``PLAYLIST_EXPANDER`` (ytdlp or local)."""
+    name = name or os.getenv("PLAYLIST_EXPANDER", "ytdlp")
+    if name == "ytdlp":
+        return YtDlpExpander()
+    if name == "local":
+        return LocalExpander()
+    raise ValueError(f"Unknown playlist expander: {name}")
+
+
+def expand(source, expander=None):
+    """Yields the videos in source: itself for a single video, or every video of a playlist or channel."""
+    if not is_collection_url(source):
+        yield source
+        return
+    yield from (expander or create_expander()).expand(source)
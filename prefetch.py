@@ -0,0 +1,79 @@
+"""Speculative background work for the Streamlit app.
+
+As soon as a valid URL is entered, the app starts fetching the transcript
+(and, optionally, the summary) on a shared worker pool, before "Generate
+Summary" is clicked. The foreground path does not wait on the job directly:
+it calls the same single-flight and cache-backed functions, so it either
+finds the result already cached or joins the computation still in flight.
+
+Each session holds at most one ``PrefetchJob``. When the URL or the settings
+change, the old job is cancelled: a queued job never starts, and a running
+job stops at its next ``cancelled`` check. A step already in progress (a
+transcript download or a Gemini call) cannot be interrupted and simply
+finishes into the cache.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = int(os.getenv("PREFETCH_WORKERS", 4))
+
+
+class PrefetchJob:
+    """One speculative computation, identified by the inputs it was started for."""
+
+    def __init__(self, key, future, cancelled):
+        self.key = key
+        self.future = future
+        self.cancelled = cancelled
+
+    def cancel(self):
+        """Discards the job: it will not start, or stops at its next checkpoint if running."""
+        self.cancelled.set()
+        self.future.cancel()
+
+
+class Prefetcher:
+    """Bounded worker pool for speculative jobs, shared across sessions."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self.started = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def submit(self, key, function):
+        """Runs function(cancelled) in the background and returns its PrefetchJob.
+
+        cancelled is a threading.Event the function should check between steps.
+        Exceptions are counted and otherwise ignored; the foreground path
+        reports its own errors when it repeats the work.
+        """
+        cancelled = threading.Event()
+
+        def run():
+            if cancelled.is_set():
+                return None
+            try:
+                return function(cancelled)
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                return None
+
+        with self._lock:
+            self.started += 1
+        return PrefetchJob(key, self._executor.submit(run), cancelled)
+
+    def cancel(self, job):
+        """Cancels job and counts it if it had not finished."""
+        if not job.future.done():
+            with self._lock:
+                self.cancelled += 1
+        job.cancel()
+
+    def stats(self):
+        """Returns how many jobs were started, cancelled before finishing, and failed."""
+        with self._lock:
+            return {"started": self.started, "cancelled": self.cancelled, "failed": self.failed}
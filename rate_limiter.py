@@ -0,0 +1,147 @@
+"""Client-side rate limiting, adaptive concurrency and retries for Gemini calls.
+
+``RateLimiter`` combines:
+
+* token buckets for requests per minute and (estimated) tokens per minute,
+* an AIMD concurrency window: it grows by one after each success and halves
+  whenever Gemini reports throttling (429) or overload (503),
+* retries with jittered exponential backoff for those transient errors.
+  Errors marked ``retryable = False`` (a stream that already delivered
+  chunks) are never retried, though their cause still counts as throttling.
+
+Use one limiter per API key and wrap every generate call with ``call``, so
+summaries and questions share the same quota.
+"""
+import os
+import random
+import threading
+import time
+
+DEFAULT_REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", 60))
+DEFAULT_TOKENS_PER_MINUTE = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", 1_000_000))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+RETRYABLE_STATUS_CODES = (429, 500, 503)
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at capacity per minute."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Blocks until amount tokens are available, then takes them."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / 60)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) * 60 / self.capacity
+            time.sleep(wait)
+
+
+def status_code(error):
+    """Returns the HTTP status code carried by a Gemini API error, or None."""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    # google.api_core exceptions expose the HTTP status as ``code``; gRPC-style
+    # errors expose a callable ``code()`` instead, so fall back on the class name
+    name = type(error).__name__
+    return {"ResourceExhausted": 429, "TooManyRequests": 429, "ServiceUnavailable": 503,
+            "InternalServerError": 500}.get(name)
+
+
+class RateLimiter:
+    """Shared limiter wrapping Gemini calls with quotas, AIMD concurrency and retries."""
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, max_retries=DEFAULT_MAX_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.concurrency = float(max_concurrency)
+        self.active = 0
+        self.throttled = 0
+        self.retries = 0
+        self._condition = threading.Condition()
+
+    def _enter(self):
+        with self._condition:
+            while self.active >= max(1, int(self.concurrency)):
+                self._condition.wait()
+            self.active += 1
+
+    def _exit(self, throttled):
+        with self._condition:
+            self.active -= 1
+            if throttled:
+                # Multiplicative decrease
+                self.concurrency = max(1.0, self.concurrency / 2)
+                self.throttled += 1
+            else:
+                # Additive increase, about one slot per window's worth of successes
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1 / max(1.0, self.concurrency))
+            self._condition.notify_all()
+
+    def call(self, fn, estimated_tokens=1):
+        """Calls fn() within the quotas, retrying throttling and transient server errors."""
+        attempt = 0
+        while True:
+            self.requests.acquire()
+            self.tokens.acquire(estimated_tokens)
+            self._enter()
+            throttled = False
+            try:
+                return fn()
+            except Exception as e:
+                retryable = getattr(e, "retryable", True)
+                code = status_code(e if retryable else (e.__cause__ or e))
+                throttled = code in THROTTLE_STATUS_CODES
+                if not retryable or code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    raise
+            finally:
+                self._exit(throttled)
+
+            # Full jitter: sleep a random time up to the exponential backoff cap
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+            time.sleep(random.uniform(0, delay))
+            attempt += 1
+            with self._condition:
+                self.retries += 1
+
+    def stats(self):
+        """Returns the current concurrency window and throttling/retry counters."""
+        with self._condition:
+            return {"concurrency": int(self.concurrency), "active": self.active,
+                    "throttled": self.throttled, "retries": self.retries}
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key=None):
+    """Returns the process-wide limiter for api_key, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(api_key)
+        if limiter is None:
+            limiter = _limiters[api_key] = RateLimiter()
+        return limiter
@@ -0,0 +1,169 @@
+"""Cache for generated summaries and answers.
+
+Results are keyed by a hash of the transcript, the model name, the prompt
+template and any generation parameters (such as ``word_count``), so identical
+requests are served locally instead of calling Gemini again. Storage is
+pluggable: ``MemoryBackend`` keeps an in-process LRU, ``DiskBackend`` persists
+results in SQLite so they survive restarts.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+DEFAULT_DISK_PATH = os.getenv(
+    "RESULT_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "yt_summarizer", "results.sqlite3"),
+)
+DEFAULT_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 1024))
+DEFAULT_TTL = int(os.getenv("RESULT_CACHE_TTL", 30 * 24 * 3600))  # thirty days
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(transcript, model_name, template, **params):
+    """Builds a cache key from the transcript, model, prompt template and parameters."""
+    parts = {
+        "transcript": _sha256(transcript),
+        "model": model_name,
+        "template": _sha256(template),
+        "params": params,
+    }
+    return _sha256(json.dumps(parts, sort_keys=True, default=str))
+
+
+class MemoryBackend:
+    """In-process LRU backend bounded by entry count."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskBackend:
+    """SQLite backend with TTL expiry and LRU eviction bounded by entry count."""
+
+    def __init__(self, path=DEFAULT_DISK_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+
+    def get(self, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT data, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            data, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+        return zlib.decompress(data).decode("utf-8")
+
+    def set(self, key, value):
+        now = time.time()
+        data = zlib.compress(value.encode("utf-8"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", (key, data, now, now)
+            )
+            self._conn.execute(
+                """DELETE FROM results WHERE key IN (
+                    SELECT key FROM results ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+
+
+class ResultCache:
+    """Caches generated text on top of a backend and counts hits and misses."""
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, bypass=False):
+        """Returns the cached result for key, or calls compute() and caches its result.
+
+        With ``bypass=True`` the cache is neither read nor written. Results of
+        None (failed generations) are never cached.
+        """
+        if bypass:
+            return compute()
+
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if value is not None:
+            return value
+
+        value = compute()
+        if value is not None:
+            self.backend.set(key, value)
+        return value
+
+    def stats(self):
+        """Returns the hit and miss counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def create_result_cache(backend_name=None):
+    """Creates a ResultCache using the backend named by ``RESULT_CACHE_BACKEND`` (memory or disk)."""
+    backend_name = backend_name or os.getenv("RESULT_CACHE_BACKEND", "memory")
+    if backend_name == "disk":
+        return ResultCache(DiskBackend())
+    if backend_name == "memory":
+        return ResultCache(MemoryBackend())
+    raise ValueError(f"Unknown result cache backend: {backend_name}")
@@ -0,0 +1,51 @@
+"""Incremental (streamed) Gemini generation with time-to-first-token measurement."""
+import time
+
+
+class StreamInterrupted(Exception):
+    """A streamed generation failed after some of its chunks were already delivered.
+
+    Retrying would deliver those chunks a second time, so rate limiters must
+    not retry it. The original error is kept as ``__cause__``.
+    """
+
+    retryable = False
+
+    def __init__(self, error, partial_text):
+        super().__init__(f"Generation stopped partway through: {error}")
+        self.partial_text = partial_text
+
+
+def generate_streaming(model, prompt, on_chunk=None):
+    """Streams a generation from model, calling on_chunk(text) for every chunk as it arrives.
+
+    Returns the full generated text and a dict with ``time_to_first_token``
+    and ``total_time`` in seconds. An error raised once chunks have been
+    delivered is re-raised as StreamInterrupted.
+    """
+    start = time.perf_counter()
+    time_to_first_token = None
+    parts = []
+
+    try:
+        for chunk in model.generate_content(prompt, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. only safety metadata) are skipped
+                continue
+            if time_to_first_token is None:
+                time_to_first_token = time.perf_counter() - start
+            parts.append(text)
+            if on_chunk is not None:
+                on_chunk(text)
+    except Exception as e:
+        if parts:
+            raise StreamInterrupted(e, "".join(parts)) from e
+        raise
+
+    stats = {
+        "time_to_first_token": time_to_first_token,
+        "total_time": time.perf_counter() - start,
+    }
+    return "".join(parts), stats
@@ -0,0 +1,108 @@
+"""Reuse of existing summaries when only the summary length changes.
+
+A summary of N words generated from the transcript (a "primary" summary)
+already holds everything a shorter summary of the same video needs, so a
+shorter summary can be derived by condensing it: a prompt of a few hundred
+words instead of the whole transcript. ``SummaryHierarchy`` records the
+primary summaries of each transcript in the result cache and serves each
+request by this policy:
+
+1. A primary summary of exactly the requested length is returned as is.
+2. Otherwise the smallest primary at least ``min_ratio`` times the requested
+   length is condensed to it. Derived summaries are never used as sources, so
+   detail is not lost over repeated condensing.
+3. Otherwise (nothing long enough, or bypassing the cache) the summary goes
+   back to the full transcript, at ``max(word_count, base_words)`` words, and
+   is recorded as a new primary (unless bypassing the cache, which neither
+   reads nor writes primaries). Long transcripts still reuse their cached
+   chunk summaries on that path. With ``SUMMARY_BASE_WORDS`` set, the first
+   summary of a video is generated that long and then condensed, so every
+   later shorter length is derived.
+"""
+import json
+import os
+import threading
+
+from result_cache import make_key
+
+DEFAULT_MIN_RATIO = float(os.getenv("SUMMARY_DERIVE_MIN_RATIO", 1.5))
+DEFAULT_BASE_WORDS = int(os.getenv("SUMMARY_BASE_WORDS", 0))  # 0 generates primaries at the requested length
+
+CONDENSE_PROMPT = (
+    "The following is a summary of a YouTube video in about {source_words} words. Condense it into a summary "
+    "of about {word_count} words. Keep the most important key points and main takeaways, and add nothing "
+    "that is not in it:\n\n{summary}"
+)
+# Identifies the per-transcript index of primary summaries in the result cache
+INDEX_TEMPLATE = "summary-hierarchy-v1"
+
+
+class SummaryHierarchy:
+    """Per-transcript primary summaries, kept in a result cache, and the policy for deriving from them."""
+
+    def __init__(self, cache, model_name, min_ratio=DEFAULT_MIN_RATIO, base_words=DEFAULT_BASE_WORDS):
+        self.cache = cache
+        self.model_name = model_name
+        self.min_ratio = min_ratio
+        self.base_words = base_words
+        self.derived = 0
+        self.full = 0
+        self._lock = threading.Lock()
+
+    def _index_key(self, text):
+        return make_key(text, self.model_name, INDEX_TEMPLATE)
+
+    def primaries(self, text):
+        """Returns {word_count: summary} for the primary summaries recorded for text."""
+        stored = self.cache.backend.get(self._index_key(text))
+        return {int(words): summary for words, summary in json.loads(stored).items()} if stored else {}
+
+    def record(self, text, word_count, summary):
+        """Records summary as the primary summary of text at word_count words."""
+        with self._lock:
+            primaries = self.primaries(text)
+            primaries[word_count] = summary
+            self.cache.backend.set(self._index_key(text), json.dumps(primaries))
+
+    def pick_source(self, text, word_count):
+        """Returns (words, summary) for the primary to serve word_count from, or None to use the full transcript."""
+        primaries = self.primaries(text)
+        if word_count in primaries:
+            return word_count, primaries[word_count]
+        candidates = [words for words in primaries if words >= word_count * self.min_ratio]
+        if not candidates:
+            return None
+        words = min(candidates)
+        return words, primaries[words]
+
+    def summarize(self, text, word_count, summarize_full, generate, bypass=False):
+        """Returns a summary of text in about word_count words, deriving it when the policy allows.
+
+        summarize_full(words) summarizes the full transcript; generate(prompt)
+        runs a condense prompt. Both return the generated text.
+        """
+        source = None if bypass else self.pick_source(text, word_count)
+        if source is None:
+            words = max(word_count, self.base_words)
+            summary = summarize_full(words)
+            with self._lock:
+                self.full += 1
+            if summary is None:
+                return None
+            if not bypass:
+                self.record(text, words, summary)
+            if words == word_count:
+                return summary
+            source = words, summary
+
+        source_words, summary = source
+        if source_words == word_count:
+            return summary
+        with self._lock:
+            self.derived += 1
+        return generate(CONDENSE_PROMPT.format(source_words=source_words, word_count=word_count, summary=summary))
+
+    def stats(self):
+        """Returns how many summaries were derived from a primary and how many went to the full transcript."""
+        with self._lock:
+            return {"derived": self.derived, "full": self.full}
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import api_server
+from api_server import APIError, APIServer, validate_ask, validate_summarize
+
+
+class FakeWriter:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+    def response(self):
+        head, _, body = self.data.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(body)
+
+
+def make_server(workers=1, queue_size=2, timeout=5.0):
+    server = APIServer(workers=workers, queue_size=queue_size, timeout=timeout)
+    server.queue = asyncio.Queue(maxsize=queue_size)
+    server.executor = ThreadPoolExecutor(max_workers=workers)
+    return server
+
+
+async def request(server, raw):
+    reader = asyncio.StreamReader()
+    if raw is not None:
+        reader.feed_data(raw)
+        reader.feed_eof()
+    writer = FakeWriter()
+    await server._handle_connection(reader, writer)
+    return writer.response()
+
+
+def post(path, body):
+    data = json.dumps(body).encode("utf-8")
+    return b"POST %s HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (path.encode(), len(data), data)
+
+
+@pytest.mark.parametrize("body", [
+    {"video": "abc", "word_count": "abc"},
+    {"video": "abc", "word_count": True},
+    {"video": "abc", "word_count": 0},
+    {"video": 123},
+    {"video": "abc", "stream": "yes"},
+    {"word_count": 100},
+])
+def test_summarize_validation_rejects(body):
+    with pytest.raises(APIError) as error:
+        validate_summarize(body)
+    assert error.value.status == 400
+
+
+@pytest.mark.parametrize("body", [
+    {"video": "abc"},
+    {"video": "abc", "question": 5},
+    {"video": "abc", "questions": "not a list"},
+    {"video": "abc", "questions": ["ok", 1]},
+])
+def test_ask_validation_rejects(body):
+    with pytest.raises(APIError) as error:
+        validate_ask(body)
+    assert error.value.status == 400
+
+
+def test_valid_requests_pass_validation():
+    validate_summarize({"video": "abc", "word_count": 120, "stream": True, "compact": False})
+    validate_ask({"video": "abc", "question": "why?"})
+    validate_ask({"video": "abc", "questions": ["why?", "how?"]})
+
+
+def test_invalid_request_is_answered_without_queueing():
+    async def run():
+        server = make_server()
+        response = await request(server, post("/summarize", {"video": "abc", "word_count": "abc"}))
+        return response, server.queue.qsize()
+
+    (status, body), queued = asyncio.run(run())
+    assert status == 400 and "word_count" in body["error"]
+    assert queued == 0
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5"])
+def test_bad_content_length_is_a_400(length):
+    raw = b"POST /summarize HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}"
+    status, body = asyncio.run(request(make_server(), raw))
+    assert status == 400 and body["error"] == "Invalid Content-Length."
+
+
+def test_idle_client_times_out(monkeypatch):
+    monkeypatch.setattr(api_server, "READ_TIMEOUT", 0.05)
+    status, _ = asyncio.run(request(make_server(), None))
+    assert status == 408
+
+
+def test_timed_out_job_keeps_its_worker_until_it_finishes(monkeypatch):
+    release = threading.Event()
+
+    def slow(request, on_chunk=None):
+        release.wait(5)
+        return {"summary": "late"}
+
+    monkeypatch.setitem(api_server.ROUTES, "/summarize", (validate_summarize, slow))
+
+    async def run():
+        server = make_server(timeout=0.1)
+        worker = asyncio.create_task(server._worker())
+        status, _ = await request(server, post("/summarize", {"video": "abc"}))
+        during = (server.running, server.abandoned)
+        release.set()
+        await asyncio.wait_for(server.queue.join(), 5)
+        after = (server.running, server.abandoned)
+        worker.cancel()
+        return status, during, after
+
+    status, during, after = asyncio.run(run())
+    assert status == 504
+    assert during == (1, 1)
+    assert after == (0, 0)
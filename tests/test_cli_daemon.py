@@ -0,0 +1,94 @@
+import io
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import cli_daemon
+
+
+def start_daemon(path, run, environment):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen()
+
+    def accept():
+        with server:
+            connection, _ = server.accept()
+            cli_daemon._handle(connection, run, threading.Lock(), environment)
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_request_runs_on_the_daemon_with_stdin(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("GOOGLE_API_KEY", "key")
+    calls = []
+
+    def run(argv, cwd, stdin):
+        calls.append((argv, cwd, stdin))
+        print("summary")
+
+    path = str(tmp_path / "cli.sock")
+    thread = start_daemon(path, run, cli_daemon.environment_fingerprint())
+    code = cli_daemon.forward(["--batch", "-"], path, io.StringIO("abc\n"))
+    thread.join(5)
+
+    assert code == 0
+    assert calls == [(["--batch", "-"], os.getcwd(), "abc\n")]
+    assert capsys.readouterr().out == "summary\n"
+
+
+def test_client_with_other_settings_is_refused_before_stdin_is_read(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("GOOGLE_API_KEY", "daemon key")
+    path = str(tmp_path / "cli.sock")
+    thread = start_daemon(path, lambda *args: None, cli_daemon.environment_fingerprint())
+    monkeypatch.setenv("GOOGLE_API_KEY", "client key")
+    monkeypatch.setenv("GEMINI_MAX_CONCURRENCY", "2")
+    stdin = io.StringIO("abc\n")
+
+    assert cli_daemon.forward(["abc"], path, stdin) is None
+    thread.join(5)
+    assert stdin.read() == "abc\n"
+    error = capsys.readouterr().err
+    assert "GEMINI_MAX_CONCURRENCY, GOOGLE_API_KEY" in error
+    assert "client key" not in error
+
+
+def test_sigterm_removes_the_socket(tmp_path):
+    path = str(tmp_path / "cli.sock")
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    daemon = subprocess.Popen([sys.executable, "-c", f"import cli_daemon; cli_daemon.serve(lambda *a: None, {path!r})"],
+                              cwd=repo, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert os.path.exists(path)
+        daemon.send_signal(signal.SIGTERM)
+        daemon.wait(10)
+    finally:
+        daemon.kill()
+    assert not os.path.exists(path)
+
+
+def test_transcript_index_is_rebuilt_when_the_transcript_changes(monkeypatch):
+    import gemini_1_5_cli as cli
+    from transcript import Transcript
+    from transcript_index import format_context
+
+    texts = ["the cat sat on the mat"]
+    monkeypatch.setattr(cli, "get_transcript", lambda video_id: Transcript.from_segments(
+        [{"text": texts[0], "start": 0.0, "duration": 1.0}], "en"))
+    monkeypatch.setattr(cli, "_indexes", type(cli._indexes)())
+
+    first = cli.get_transcript_index("video", compact=False)
+    assert cli.get_transcript_index("video", compact=False) is first
+    texts[0] = "a dog ran in the park"
+    refreshed = cli.get_transcript_index("video", compact=False)
+    assert refreshed is not first
+    assert "dog" in format_context(refreshed.search("dog"))
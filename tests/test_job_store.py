@@ -0,0 +1,88 @@
+import io
+import json
+from collections import Counter
+
+import pytest
+
+import gemini_1_5_cli as cli
+from export import JSONLWriter
+from job_store import FAILED, SUMMARIZED, JobStore
+from transcript import Transcript
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Fakes transcript fetches and Gemini calls; returns the fetch count per video ID.
+
+    Video IDs starting with "bad" always fail to fetch; those starting with
+    "flaky" fail on their first fetch only.
+    """
+    counts = Counter()
+
+    def load_transcript(video_id, compact=True):
+        counts[video_id] += 1
+        if video_id.startswith("bad") or (video_id.startswith("flaky") and counts[video_id] == 1):
+            return None
+        return Transcript.from_segments([{"text": f"transcript of {video_id}", "start": 0.0, "duration": 1.0}], "en")
+
+    monkeypatch.setattr(cli, "load_transcript", load_transcript)
+    monkeypatch.setattr(cli, "summarize_text", lambda text, prompt_prefix, usage=None, **kwargs: f"summary: {text}")
+    return counts
+
+
+def run_cli(tmp_path, videos, *argv):
+    batch = tmp_path / "videos.txt"
+    batch.write_text("\n".join(videos) + "\n", encoding="utf-8")
+    parser = cli.build_parser()
+    cli.run(parser.parse_args(["--batch", str(batch), "--jobs", str(tmp_path / "jobs.sqlite"), *argv]), parser)
+
+
+def read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_second_run_skips_finished_videos_and_keeps_earlier_output(tmp_path, fetches):
+    output = tmp_path / "out.jsonl"
+    run_cli(tmp_path, ["a", "bad1"], "-o", str(output), "--max-attempts", "1")
+    run_cli(tmp_path, ["a", "bad1", "b"], "-o", str(output), "--max-attempts", "1")
+
+    assert fetches == {"a": 1, "bad1": 1, "b": 1}
+    records = {record["video_id"]: record for record in read_jsonl(output)}
+    assert len(read_jsonl(output)) == 3
+    assert records["a"]["summary"] == "summary: transcript of a"
+    assert records["b"]["summary"] == "summary: transcript of b"
+    assert records["bad1"]["error"] == "Failed to fetch transcript."
+
+
+def test_parquet_output_is_rewritten_with_earlier_results(tmp_path, fetches):
+    pq = pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / "out.parquet"
+    run_cli(tmp_path, ["a"], "-o", str(output))
+    run_cli(tmp_path, ["a", "b"], "-o", str(output))
+
+    assert fetches == {"a": 1, "b": 1}
+    rows = pq.read_table(output).to_pylist()
+    assert [row["video_id"] for row in rows] == ["a", "b"]
+    assert rows[0]["summary"] == "summary: transcript of a"
+
+
+def test_retries_stop_at_max_attempts(tmp_path, fetches):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    store.add([("bad1", "bad1"), ("flaky1", "flaky1"), ("a", "a")])
+    stream = io.StringIO()
+
+    cli.run_jobs(store, [], "Summarize: ", max_attempts=3, writer=JSONLWriter(stream), retry_delay=0)
+
+    assert fetches == {"bad1": 3, "flaky1": 2, "a": 1}
+    assert store.failures() == [("bad1", "Failed to fetch transcript.", 3)]
+    assert store.counts()[SUMMARIZED] == 2 and store.counts()[FAILED] == 1
+    # Only each video's final outcome is written, not the failures that were retried
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert sorted(record["video_id"] for record in records) == ["a", "bad1", "flaky1"]
+    assert store.runnable(3) == []
+
+
+def test_parquet_without_an_output_file_is_rejected_before_any_work(tmp_path, fetches):
+    with pytest.raises(SystemExit):
+        run_cli(tmp_path, ["a"], "--format", "parquet")
+    assert fetches == {}
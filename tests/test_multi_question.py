@@ -0,0 +1,46 @@
+from multi_question import answer_questions, parse_answers
+
+
+def test_parses_a_list_of_strings():
+    assert parse_answers('["First. ", "Second."]', 2) == ["First.", "Second."]
+
+
+def test_parses_numbered_answers_in_any_order():
+    text = '{"answers": [{"question": 2, "answer": "B"}, {"question": 1, "answer": "A"}]}'
+    assert parse_answers(text, 2) == ["A", "B"]
+
+
+def test_strips_a_markdown_fence():
+    assert parse_answers('```json\n["A", "B"]\n```', 2) == ["A", "B"]
+
+
+def test_rejects_malformed_responses():
+    assert parse_answers("not json", 1) is None
+    assert parse_answers('["A"]', 2) is None
+    assert parse_answers('[{"question": 3, "answer": "A"}, "B"]', 2) is None
+    assert parse_answers('[{"question": 1, "answer": "A"}, {"question": 1, "answer": "B"}]', 2) is None
+    assert parse_answers('[1, 2]', 2) is None
+
+
+def test_answers_all_questions_in_one_call():
+    prompts = []
+
+    def generate(prompt):
+        prompts.append(prompt)
+        return '["A", ""]'
+
+    assert answer_questions(["one?", "two?"], "context", generate, lambda question: None) == ["A", ""]
+    assert len(prompts) == 1
+
+
+def test_splits_the_batch_when_the_response_does_not_parse():
+    def generate(prompt):
+        return "garbled" if "3." in prompt else '["first", "second"]'
+
+    answers = answer_questions(["q1?", "q2?", "q3?", "q4?"], "context", generate, lambda question: f"single {question}")
+    assert answers == ["first", "second", "first", "second"]
+
+
+def test_falls_back_to_single_answers():
+    answers = answer_questions(["q1?", "q2?"], "context", lambda prompt: "garbled", lambda question: f"single {question}")
+    assert answers == ["single q1?", "single q2?"]
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+import pipeline
+from pipeline import run_pipeline
+
+
+def pipeline_threads():
+    return [thread for thread in threading.enumerate() if thread.name != "MainThread" and thread.is_alive()]
+
+
+def wait_for_threads(before, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if len(pipeline_threads()) <= before:
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_every_item_goes_through_every_stage():
+    stages = [
+        (lambda n: [n, n + 100], 2),
+        (lambda n: [n * 2], 3),
+    ]
+    results = list(run_pipeline(range(10), stages, queue_size=2))
+    assert sorted(results) == sorted([n * 2 for n in range(10)] + [(n + 100) * 2 for n in range(10)])
+
+
+def test_stage_errors_are_raised_to_the_consumer():
+    def fail(n):
+        if n == 3:
+            raise ValueError("bad item")
+        return [n]
+
+    with pytest.raises(ValueError, match="bad item"):
+        list(run_pipeline(range(5), [(fail, 1)]))
+
+
+def test_input_errors_are_raised_to_the_consumer():
+    def items():
+        yield 1
+        raise RuntimeError("listing failed")
+
+    with pytest.raises(RuntimeError, match="listing failed"):
+        list(run_pipeline(items(), [(lambda n: [n], 1)]))
+
+
+def test_stopping_early_releases_every_thread(monkeypatch):
+    monkeypatch.setattr(pipeline, "POLL_INTERVAL", 0.01)
+    before = len(pipeline_threads())
+
+    results = run_pipeline(iter(range(1000)), [(lambda n: [n], 2), (lambda n: [n], 2)], queue_size=1)
+    assert next(results) is not None
+    # Every queue is full by now and the workers are blocked putting into them
+    time.sleep(0.1)
+    results.close()
+
+    assert wait_for_threads(before)
+
+
+def test_consumer_errors_release_every_thread(monkeypatch):
+    monkeypatch.setattr(pipeline, "POLL_INTERVAL", 0.01)
+    before = len(pipeline_threads())
+
+    def consume():
+        for n in run_pipeline(iter(range(1000)), [(lambda n: [n], 3)], queue_size=1):
+            raise KeyError(n)
+
+    with pytest.raises(KeyError):
+        consume()
+    assert wait_for_threads(before)
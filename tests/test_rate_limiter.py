@@ -0,0 +1,124 @@
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter, TokenBucket
+from streaming import StreamInterrupted
+
+
+class APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class ResourceExhausted(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Records the delays the limiter sleeps instead of sleeping."""
+    delays = []
+    monkeypatch.setattr(rate_limiter.time, "sleep", delays.append)
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: high)
+    return delays
+
+
+def limiter(**kwargs):
+    return RateLimiter(requests_per_minute=6000, tokens_per_minute=10**9, **kwargs)
+
+
+def failing(*errors, result="ok"):
+    """Returns a function that raises each of errors in turn, then returns result."""
+    errors = list(errors)
+    calls = []
+
+    def call():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    call.calls = calls
+    return call
+
+
+def test_status_code_reads_code_attributes_and_class_names():
+    assert rate_limiter.status_code(APIError(503)) == 503
+    assert rate_limiter.status_code(ResourceExhausted()) == 429
+    assert rate_limiter.status_code(ValueError()) is None
+
+
+def test_throttling_halves_the_window_and_successes_grow_it():
+    gemini = limiter(max_concurrency=8)
+    assert gemini.call(failing(APIError(429))) == "ok"
+    assert gemini.concurrency == pytest.approx(4 + 1 / 4)
+    stats = gemini.stats()
+    assert stats["throttled"] == 1 and stats["retries"] == 1 and stats["active"] == 0
+
+    for _ in range(50):
+        gemini.call(lambda: "ok")
+    assert gemini.concurrency == 8
+
+
+def test_window_never_drops_below_one():
+    gemini = limiter(max_concurrency=2, max_retries=10)
+    gemini.call(failing(*[APIError(503)] * 5))
+    assert gemini.stats()["concurrency"] >= 1
+
+
+def test_retries_back_off_exponentially_up_to_the_cap(no_sleep):
+    gemini = limiter(base_delay=1.0, max_delay=5.0, max_retries=4)
+    work = failing(*[APIError(500)] * 4)
+    assert gemini.call(work) == "ok"
+    assert len(work.calls) == 5
+    assert no_sleep == [1.0, 2.0, 4.0, 5.0]
+    # 500s are retried but are not throttling
+    assert gemini.stats()["throttled"] == 0
+
+
+def test_gives_up_after_max_retries():
+    gemini = limiter(max_retries=2)
+    work = failing(*[APIError(429)] * 5)
+    with pytest.raises(APIError):
+        gemini.call(work)
+    assert len(work.calls) == 3
+
+
+def test_other_errors_are_not_retried():
+    gemini = limiter()
+    work = failing(APIError(400))
+    with pytest.raises(APIError):
+        gemini.call(work)
+    assert len(work.calls) == 1
+
+
+def test_interrupted_streams_are_not_retried_but_count_as_throttling():
+    gemini = limiter(max_concurrency=8)
+    interrupted = StreamInterrupted(APIError(429), "partial")
+    interrupted.__cause__ = APIError(429)
+    work = failing(interrupted)
+    with pytest.raises(StreamInterrupted):
+        gemini.call(work)
+    assert len(work.calls) == 1
+    assert gemini.stats()["throttled"] == 1 and gemini.stats()["retries"] == 0
+
+
+def test_token_bucket_waits_for_the_refill(monkeypatch, no_sleep):
+    now = [100.0]
+
+    def sleep(seconds):
+        no_sleep.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(rate_limiter.time, "sleep", sleep)
+    bucket = TokenBucket(60)  # one token per second
+
+    bucket.acquire(60)
+    assert no_sleep == []
+    bucket.acquire(3)
+    assert no_sleep == [pytest.approx(3.0)]
+    # Requests larger than the bucket are capped instead of waiting forever
+    bucket.acquire(1000)
+    assert sum(no_sleep) == pytest.approx(63.0)
@@ -0,0 +1,83 @@
+import pytest
+
+import result_cache
+from result_cache import DiskBackend, MemoryBackend, ResultCache, create_result_cache, make_key
+
+
+def test_key_depends_on_every_input():
+    key = make_key("transcript", "gemini-1.5-pro", "Summarize: ", word_count=100)
+    assert key == make_key("transcript", "gemini-1.5-pro", "Summarize: ", word_count=100)
+    assert key != make_key("transcript.", "gemini-1.5-pro", "Summarize: ", word_count=100)
+    assert key != make_key("transcript", "gemini-1.5-flash", "Summarize: ", word_count=100)
+    assert key != make_key("transcript", "gemini-1.5-pro", "Summarise: ", word_count=100)
+    assert key != make_key("transcript", "gemini-1.5-pro", "Summarize: ", word_count=200)
+
+
+@pytest.mark.parametrize("backend", [lambda: MemoryBackend(), lambda: DiskBackend(":memory:")])
+def test_results_are_computed_once(backend):
+    cache = ResultCache(backend())
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "summary"
+
+    assert cache.get_or_compute("key", compute) == "summary"
+    assert cache.get_or_compute("key", compute) == "summary"
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_failed_generations_are_not_cached():
+    cache = ResultCache()
+    assert cache.get_or_compute("key", lambda: None) is None
+    assert cache.get_or_compute("key", lambda: "summary") == "summary"
+
+
+def test_bypass_neither_reads_nor_writes():
+    cache = ResultCache()
+    cache.get_or_compute("key", lambda: "cached")
+    assert cache.get_or_compute("key", lambda: "fresh", bypass=True) == "fresh"
+    assert cache.get_or_compute("other", lambda: "fresh", bypass=True) == "fresh"
+    assert cache.backend.get("key") == "cached"
+    assert cache.backend.get("other") is None
+    assert cache.stats() == {"hits": 0, "misses": 1}
+
+
+@pytest.mark.parametrize("backend", [lambda: MemoryBackend(max_entries=2), lambda: DiskBackend(":memory:", max_entries=2)])
+def test_least_recently_used_entries_are_evicted(backend, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    backend = backend()
+    for key in ("a", "b"):
+        backend.set(key, key)
+        now[0] += 1
+    backend.get("a")
+    now[0] += 1
+    backend.set("c", "c")
+
+    assert backend.get("a") == "a"
+    assert backend.get("b") is None
+    assert backend.get("c") == "c"
+
+
+def test_disk_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache.time, "time", lambda: now[0])
+    backend = DiskBackend(":memory:", ttl=60)
+    backend.set("key", "summary")
+    now[0] += 59
+    assert backend.get("key") == "summary"
+    now[0] += 2
+    assert backend.get("key") is None
+
+
+def test_disk_results_survive_a_restart(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    DiskBackend(path).set("key", "résumé")
+    assert DiskBackend(path).get("key") == "résumé"
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_result_cache("redis")
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def run_concurrently(flight, key, compute, callers):
+    """Calls flight.do(key, compute) from callers threads; returns their results or exceptions."""
+    outcomes = [None] * callers
+
+    def call(position):
+        try:
+            outcomes[position] = flight.do(key, compute)
+        except Exception as e:
+            outcomes[position] = e
+
+    threads = [threading.Thread(target=call, args=(position,)) for position in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def wait_for_waiters(flight, count):
+    while flight.stats()["coalesced"] < count:
+        time.sleep(0.01)
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return "summary"
+
+    threads, outcomes = run_concurrently(flight, "key", compute, 5)
+    wait_for_waiters(flight, 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert outcomes == ["summary"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"executed": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise ValueError("quota exceeded")
+
+    threads, outcomes = run_concurrently(flight, "key", compute, 3)
+    wait_for_waiters(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+
+def test_finished_keys_run_again_and_keys_are_independent():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("a", lambda: 2) == 2
+    assert flight.do("b", lambda: 3) == 3
+    with pytest.raises(KeyError):
+        flight.do("a", lambda: {}["missing"])
+    assert flight.do("a", lambda: 4) == 4
+    assert flight.stats() == {"executed": 5, "coalesced": 0, "in_flight": 0}
@@ -0,0 +1,32 @@
+from result_cache import ResultCache
+from summary_hierarchy import SummaryHierarchy
+
+
+def summarize(hierarchy, word_count, bypass=False):
+    calls = []
+
+    def summarize_full(words):
+        calls.append(("full", words))
+        return f"full summary in {words} words"
+
+    def generate(prompt):
+        calls.append(("condense", word_count))
+        return f"condensed to {word_count} words"
+
+    return hierarchy.summarize("transcript", word_count, summarize_full, generate, bypass=bypass), calls
+
+
+def test_shorter_summary_is_condensed_from_a_longer_primary():
+    hierarchy = SummaryHierarchy(ResultCache(), "model")
+    summarize(hierarchy, 500)
+    summary, calls = summarize(hierarchy, 200)
+    assert summary == "condensed to 200 words"
+    assert calls == [("condense", 200)]
+
+
+def test_bypass_neither_reads_nor_records_primaries():
+    hierarchy = SummaryHierarchy(ResultCache(), "model")
+    summarize(hierarchy, 500, bypass=True)
+    assert hierarchy.primaries("transcript") == {}
+    _, calls = summarize(hierarchy, 200)
+    assert calls == [("full", 200)]
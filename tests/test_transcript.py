@@ -0,0 +1,64 @@
+import pytest
+
+from chunked_summary import CHARS_PER_TOKEN, segments_from_text, split_segments
+from transcript import Transcript
+from transcript_index import format_context
+
+SEGMENTS = [
+    {"text": "Hello and welcome", "start": 0.0, "duration": 1.5},
+    {"text": "to the café ☕", "start": 1.5, "duration": 2.25},
+    {"text": "", "start": 3.75, "duration": 0.5},
+    {"text": "goodbye", "start": 4.25, "duration": 1.0},
+]
+
+
+def test_bytes_round_trip():
+    transcript = Transcript.from_segments(SEGMENTS)
+    restored = Transcript.from_bytes(transcript.to_bytes())
+    assert restored.text == transcript.text
+    assert list(restored) == list(transcript) == SEGMENTS
+
+
+def test_bytes_round_trip_of_an_empty_transcript():
+    restored = Transcript.from_bytes(Transcript.from_segments([]).to_bytes())
+    assert restored.text == ""
+    assert len(restored) == 0
+
+
+def test_from_bytes_rejects_other_data():
+    with pytest.raises(ValueError):
+        Transcript.from_bytes(b"\x00" * 16)
+
+
+def test_between_returns_segments_overlapping_the_range():
+    transcript = Transcript.from_segments(SEGMENTS)
+    window = transcript.between(1.0, 4.0)
+    assert [segment["text"] for segment in window] == ["Hello and welcome", "to the café ☕", ""]
+    assert window.start == 0.0
+    assert window.end == 4.25
+    assert window.text.startswith("Hello and welcome to the café ☕")
+    assert len(transcript.between(10.0, 20.0)) == 0
+
+
+def test_untimed_segments_keep_no_start_time():
+    transcript = Transcript.from_segments(segments_from_text("one two three four five six", words_per_segment=2))
+    assert [segment["start"] for segment in transcript] == [None, None, None]
+    restored = Transcript.from_bytes(transcript.to_bytes())
+    assert [segment["start"] for segment in restored] == [None, None, None]
+    assert len(transcript.between(0.0, 100.0)) == 0
+
+
+def test_split_segments_of_an_untimed_transcript_has_no_times():
+    transcript = Transcript.from_segments(segments_from_text("word " * 400, words_per_segment=20))
+    chunks = split_segments(transcript, max_tokens=100, overlap_tokens=10)
+    assert len(chunks) > 1
+    assert all(chunk["start"] is None and chunk["end"] is None for chunk in chunks)
+    assert "[0:00]" not in format_context(chunks)
+
+
+def test_split_segments_of_a_transcript_covers_every_segment():
+    segments = [{"text": f"segment {index}", "start": index * 2.0, "duration": 2.0} for index in range(200)]
+    chunks = split_segments(Transcript.from_segments(segments), max_tokens=50, overlap_tokens=10)
+    assert chunks[0]["start"] == 0.0 and chunks[-1]["end"] == 400.0
+    assert chunks[0]["text"].startswith("segment 0 ") and chunks[-1]["text"].endswith("segment 199")
+    assert all(len(chunk["text"]) <= 50 * CHARS_PER_TOKEN for chunk in chunks)
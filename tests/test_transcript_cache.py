@@ -0,0 +1,166 @@
+import json
+import sqlite3
+import zlib
+from collections import Counter
+
+import pytest
+from youtube_transcript_api._errors import NoTranscriptFound
+
+import transcript_cache
+from transcript import Transcript
+from transcript_cache import TranscriptCache
+
+SEGMENTS = [
+    {"text": "hello", "start": 0.0, "duration": 1.5},
+    {"text": "world", "start": 1.5, "duration": 2.0},
+]
+
+
+class FakeTranscript:
+    def __init__(self, language_code, fetches, generated=False):
+        self.language_code = language_code
+        self.is_generated = generated
+        self._fetches = fetches
+
+    def fetch(self):
+        self._fetches[self.language_code] += 1
+        return [{"text": f"text in {self.language_code}", "start": 0.0, "duration": 1.0}]
+
+    def translate(self, language_code):
+        return FakeTranscript(language_code, self._fetches, self.is_generated)
+
+
+class FakeListing:
+    """A video with a manual transcript in each of languages, in listing order."""
+
+    video_id = "video"
+
+    def __init__(self, languages):
+        self.fetches = Counter()
+        self.transcripts = [FakeTranscript(code, self.fetches) for code in languages]
+
+    def __iter__(self):
+        return iter(self.transcripts)
+
+    def find_transcript(self, languages):
+        return self.find_manually_created_transcript(languages)
+
+    def find_manually_created_transcript(self, languages):
+        for code in languages:
+            for transcript in self.transcripts:
+                if transcript.language_code == code:
+                    return transcript
+        raise NoTranscriptFound(self.video_id, languages, self)
+
+    def find_generated_transcript(self, languages):
+        raise NoTranscriptFound(self.video_id, languages, self)
+
+
+@pytest.fixture
+def cache():
+    return TranscriptCache(":memory:")
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    listing = FakeListing(["es", "en"])
+    monkeypatch.setattr(transcript_cache, "list_transcripts", lambda video_id: listing)
+    return listing
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(transcript_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_round_trip_keeps_segments_and_language(cache):
+    cache.set("video", Transcript.from_segments(SEGMENTS, "en"), ("en",))
+    transcript = cache.get("video", ("en",))
+    assert transcript.text == "hello world"
+    assert transcript.language == "en"
+    assert list(transcript) == SEGMENTS
+    assert cache.get("video", ("de",)) is None
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = TranscriptCache(":memory:", ttl=60)
+    cache.set("video", SEGMENTS)
+    clock[0] += 60
+    assert cache.get("video") is not None
+    clock[0] += 1
+    assert cache.get("video") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_cap(clock):
+    cache = TranscriptCache(":memory:")
+    cache.set("a", SEGMENTS)
+    cache.max_bytes = cache.stats()["bytes"] * 2
+    clock[0] += 1
+    cache.set("b", SEGMENTS)
+    clock[0] += 1
+    cache.get("a")
+    clock[0] += 1
+    cache.set("c", SEGMENTS)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_entries_and_databases_from_older_versions_are_read(tmp_path):
+    path = str(tmp_path / "transcripts.sqlite3")
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            """CREATE TABLE transcripts (
+                video_id TEXT NOT NULL, languages TEXT NOT NULL, data BLOB NOT NULL, size INTEGER NOT NULL,
+                created_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (video_id, languages)
+            )"""
+        )
+        data = zlib.compress(json.dumps(SEGMENTS).encode("utf-8"))
+        conn.execute("INSERT INTO transcripts VALUES ('video', 'en', ?, ?, 9e9, 9e9)", (data, len(data)))
+
+    transcript = TranscriptCache(path, ttl=0).get("video")
+    assert transcript.text == "hello world"
+    assert transcript.language is None
+
+
+def test_transcripts_are_fetched_once(cache, listing):
+    first = transcript_cache.get_transcript("video", ("en",), cache=cache)
+    second = transcript_cache.get_transcript("video", ("en",), cache=cache)
+    assert first.text == second.text == "text in en"
+    assert listing.fetches == {"en": 1}
+
+
+def test_preferred_fallback_is_not_served_to_strict_lookups(cache, listing):
+    preferred = transcript_cache.get_preferred_transcript("video", ("fr",), cache=cache)
+    assert preferred.language == "es"
+    assert cache.get("video", ("fr",)) is None
+    with pytest.raises(NoTranscriptFound):
+        transcript_cache.get_transcript("video", ("fr",), cache=cache)
+
+
+def test_transcript_keeps_the_fetched_language(cache, listing):
+    transcript = transcript_cache.get_transcript("video", ("de", "en"), cache=cache)
+    assert transcript.language == "en"
+    assert cache.get("video", ("de", "en")).language == "en"
+
+
+def test_translation_into_the_preferred_language_reuses_the_cached_transcript(cache, listing):
+    preferred = transcript_cache.get_preferred_transcript("video", ("es",), cache=cache)
+    translations = transcript_cache.get_translations("video", ["es", "de"], ("es",), cache=cache)
+
+    assert translations["es"].text == preferred.text
+    assert translations["de"].text == "text in de"
+    assert listing.fetches == {"es": 1, "de": 1}
+    # Translations are cached too
+    transcript_cache.get_translations("video", ["es", "de"], ("es",), cache=cache)
+    assert listing.fetches == {"es": 1, "de": 1}
+
+
+def test_translation_into_the_preferred_language_fetches_it_once(cache, listing):
+    transcript_cache.get_translations("video", ["es"], ("es",), cache=cache)
+    transcript_cache.get_preferred_transcript("video", ("es",), cache=cache)
+    assert listing.fetches == {"es": 1}
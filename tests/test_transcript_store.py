@@ -0,0 +1,83 @@
+import gc
+
+from transcript_store import TranscriptStore
+
+
+class Blob:
+    """A value with a fixed reported size."""
+
+    def __init__(self, name, nbytes=100):
+        self.name = name
+        self.nbytes = nbytes
+
+
+def loader(name, calls=None):
+    def load():
+        if calls is not None:
+            calls.append(name)
+        return Blob(name)
+    return load
+
+
+def test_sessions_share_one_copy():
+    store = TranscriptStore()
+    first = store.ref("video", loader("video"), value=Blob("first"))
+    second = store.ref("video", loader("video"), value=Blob("second"))
+
+    assert first.get() is second.get()
+    assert first.get().name == "first"
+    assert store.stats()["entries"] == 1 and store.stats()["refs"] == 2
+
+
+def test_replace_overwrites_the_shared_copy():
+    store = TranscriptStore()
+    ref = store.ref("video", loader("video"), value=Blob("old"))
+    store.ref("video", loader("video"), value=Blob("new"), replace=True)
+    assert ref.get().name == "new"
+    assert store.stats()["bytes"] == 100
+
+
+def test_unreferenced_entries_are_evicted_first():
+    store = TranscriptStore(max_bytes=200)
+    kept = store.ref("a", loader("a"), value=Blob("a"))
+    store.get("b", loader("b"))
+    store.get("c", loader("c"))
+
+    stats = store.stats()
+    assert stats["bytes"] == 200 and stats["evictions"] == 1
+    assert kept.get().name == "a"
+    calls = []
+    store.get("b", loader("b", calls))
+    assert calls == ["b"]
+
+
+def test_referenced_entries_are_evicted_when_nothing_else_is_left_and_reloaded():
+    store = TranscriptStore(max_bytes=150)
+    calls = []
+    first = store.ref("a", loader("a", calls), value=Blob("a"))
+    store.ref("b", loader("b"), value=Blob("b"))
+
+    assert store.stats()["entries"] == 1 and store.stats()["bytes"] <= 150
+    assert first.get().name == "a"
+    assert calls == ["a"]
+
+
+def test_released_and_collected_refs_are_dropped():
+    store = TranscriptStore()
+    ref = store.ref("a", loader("a"), value=Blob("a"))
+    other = store.ref("a", loader("a"))
+    ref.release()
+    ref.release()  # releasing twice is harmless
+    assert store.stats()["refs"] == 1
+    del other
+    gc.collect()
+    assert store.stats()["refs"] == 0 and store.stats()["referenced_entries"] == 0
+
+
+def test_get_counts_hits_and_does_not_store_failed_loads():
+    store = TranscriptStore()
+    assert store.get("missing", lambda: None) is None
+    assert store.get("a", loader("a")).name == "a"
+    store.get("a", loader("a"))
+    stats = store.stats()
+    assert stats["entries"] == 1 and stats["hits"] == 1 and stats["loads"] == 2 and stats["refs"] == 0
@@ -0,0 +1,183 @@
+"""Compact, timestamped transcript representation.
+
+A ``Transcript`` keeps the whole text in one string, exactly the
+space-joined text the prompts need, plus array-backed segment offsets, start
+times and durations. Compared with a list of per-segment dicts this costs a
+few bytes per segment instead of a few hundred, while still supporting time
+range slicing, zero-copy chunk iteration (used by
+``chunked_summary.split_segments``) and a cheap binary serialization for the
+transcript cache.
+
+Segments without a start time (for example ones rebuilt from plain text) are
+stored with a NaN start and read back as ``None``, so they are never labelled
+with a made-up ``0:00`` timestamp.
+
+Iterating a ``Transcript`` yields ``{"text", "start", "duration"}`` dicts, so
+it can be passed anywhere a list of YouTube transcript segments is expected.
+"""
+import struct
+import sys
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+
+MAGIC = b"YTT1"
+_HEADER = struct.Struct("<4sII")  # magic, segment count, UTF-8 text length
+UNTIMED = math.nan  # start time of a segment that has none
+
+
+def _time(value):
+    return None if math.isnan(value) else value
+
+
+class TranscriptSlice:
+    """View over consecutive segments of a Transcript; text is only copied when asked for."""
+
+    __slots__ = ("transcript", "first", "last")
+
+    def __init__(self, transcript, first, last):
+        self.transcript = transcript
+        self.first = first
+        self.last = last
+
+    def __len__(self):
+        return self.last - self.first
+
+    def __iter__(self):
+        for index in range(self.first, self.last):
+            yield self.transcript.segment(index)
+
+    @property
+    def start(self):
+        return _time(self.transcript.starts[self.first]) if len(self) else None
+
+    @property
+    def end(self):
+        if not len(self):
+            return None
+        return _time(self.transcript.starts[self.last - 1] + self.transcript.durations[self.last - 1])
+
+    @property
+    def text(self):
+        transcript = self.transcript
+        if not len(self):
+            return ""
+        return transcript.text[transcript.offsets[self.first]:transcript.offsets[self.last] - 1]
+
+
+class Transcript:
+    """Transcript text in one buffer with array-backed offsets, starts and durations."""
+
+    __slots__ = ("text", "offsets", "starts", "durations", "language")
+
+    def __init__(self, text, offsets, starts, durations, language=None):
+        # offsets has one more entry than there are segments: segment i spans
+        # text[offsets[i]:offsets[i + 1] - 1] (the -1 drops the joining space)
+        self.text = text
+        self.offsets = offsets
+        self.starts = starts
+        self.durations = durations
+        # Language code of the fetched transcript when known; kept by the cache, not by to_bytes
+        self.language = language
+
+    @classmethod
+    def from_segments(cls, segments, language=None):
+        """Builds a Transcript from YouTube transcript segments (dicts with text, start, duration)."""
+        if isinstance(segments, cls):
+            return segments
+        texts = []
+        offsets = array("I", [0])
+        starts = array("d")
+        durations = array("d")
+        position = 0
+        for segment in segments:
+            text = segment["text"]
+            texts.append(text)
+            position += len(text) + 1
+            offsets.append(position)
+            start = segment.get("start")
+            starts.append(UNTIMED if start is None else start)
+            durations.append(segment.get("duration") or 0.0)
+        return cls(" ".join(texts), offsets, starts, durations, language)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.segment(index)
+
+    def __str__(self):
+        return self.text
+
+    def segment(self, index):
+        """Returns segment index as a ``{"text", "start", "duration"}`` dict."""
+        return {
+            "text": self.text[self.offsets[index]:self.offsets[index + 1] - 1],
+            "start": _time(self.starts[index]),
+            "duration": self.durations[index],
+        }
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the text buffer and arrays, in bytes."""
+        arrays = (self.offsets, self.starts, self.durations)
+        return sys.getsizeof(self.text) + sum(a.itemsize * len(a) for a in arrays)
+
+    def between(self, start, end):
+        """Returns a view of the segments that overlap the time range [start, end) in seconds.
+
+        The view is empty for an untimed transcript.
+        """
+        if not len(self) or math.isnan(self.starts[0]):
+            return TranscriptSlice(self, 0, 0)
+        first = bisect_right(self.starts, start)
+        if first and self.starts[first - 1] + self.durations[first - 1] > start:
+            first -= 1
+        last = bisect_left(self.starts, end, lo=first)
+        return TranscriptSlice(self, first, max(first, last))
+
+    def chunks(self, max_chars, overlap_chars=0):
+        """Yields views of consecutive segments of at most max_chars each, overlapping by up to overlap_chars."""
+        offsets = self.offsets
+        first = 0
+        count = len(self)
+        while first < count:
+            last = first + 1
+            while last < count and offsets[last + 1] - offsets[first] <= max_chars:
+                last += 1
+            yield TranscriptSlice(self, first, last)
+            if last >= count:
+                break
+            next_first = last
+            while next_first - 1 > first and offsets[last] - offsets[next_first - 1] <= overlap_chars:
+                next_first -= 1
+            first = next_first
+
+    def to_bytes(self):
+        """Serializes the transcript into a compact binary form."""
+        text = self.text.encode("utf-8")
+        arrays = [array(a.typecode, a) for a in (self.offsets, self.starts, self.durations)]
+        if sys.byteorder == "big":
+            for a in arrays:
+                a.byteswap()
+        return _HEADER.pack(MAGIC, len(self), len(text)) + b"".join(a.tobytes() for a in arrays) + text
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuilds a Transcript serialized with to_bytes."""
+        magic, count, text_length = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a serialized transcript")
+        position = _HEADER.size
+        arrays = []
+        for typecode, length in (("I", count + 1), ("d", count), ("d", count)):
+            a = array(typecode)
+            size = a.itemsize * length
+            a.frombytes(data[position:position + size])
+            if sys.byteorder == "big":
+                a.byteswap()
+            arrays.append(a)
+            position += size
+        text = data[position:position + text_length].decode("utf-8")
+        return cls(text, *arrays)
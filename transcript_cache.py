@@ -0,0 +1,272 @@
+"""Persistent on-disk transcript cache shared by every front-end.
+
+Transcripts are stored in a small SQLite database keyed by video ID and
+language list. Entries are zlib-compressed ``Transcript`` binaries, expire
+after a TTL and are evicted least-recently-used first once the database grows
+past a size cap.
+
+The per-video transcript listing (available languages, manual or
+auto-generated, translatable) is kept in memory for a short while, so language
+discovery, picking the preferred transcript and fetching it or its
+translations all reuse one ``list_transcripts`` round trip.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api._errors import NoTranscriptFound
+
+from transcript import Transcript
+
+DEFAULT_CACHE_PATH = os.getenv(
+    "TRANSCRIPT_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "yt_summarizer", "transcripts.sqlite3"),
+)
+DEFAULT_TTL = int(os.getenv("TRANSCRIPT_CACHE_TTL", 7 * 24 * 3600))  # one week
+DEFAULT_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+DEFAULT_LANGUAGES = ("en",)
+LISTING_TTL = int(os.getenv("TRANSCRIPT_LISTING_TTL", 600))
+LISTING_MAX_ENTRIES = 256
+TRANSLATION_WORKERS = 4
+
+
+class TranscriptCache:
+    """SQLite-backed transcript cache with TTL and size-bounded LRU eviction."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS transcripts (
+                    video_id TEXT NOT NULL,
+                    languages TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    language TEXT,
+                    PRIMARY KEY (video_id, languages)
+                )"""
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(transcripts)")]
+            if "language" not in columns:
+                # Caches created by older versions lack the fetched language
+                self._conn.execute("ALTER TABLE transcripts ADD COLUMN language TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transcripts_accessed ON transcripts (accessed_at)"
+            )
+
+    @staticmethod
+    def _language_key(languages):
+        return ",".join(languages or DEFAULT_LANGUAGES)
+
+    def get(self, video_id, languages=None):
+        """Returns the cached Transcript, or None on a miss or expired entry."""
+        key = self._language_key(languages)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT data, created_at, language FROM transcripts WHERE video_id = ? AND languages = ?",
+                (video_id, key),
+            ).fetchone()
+            if row is None:
+                return None
+            data, created_at, language = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute(
+                    "DELETE FROM transcripts WHERE video_id = ? AND languages = ?", (video_id, key)
+                )
+                return None
+            self._conn.execute(
+                "UPDATE transcripts SET accessed_at = ? WHERE video_id = ? AND languages = ?",
+                (now, video_id, key),
+            )
+        data = zlib.decompress(data)
+        if data.startswith(b"["):
+            # Entry written as JSON segments by an older version
+            transcript = Transcript.from_segments(json.loads(data))
+        else:
+            transcript = Transcript.from_bytes(data)
+        transcript.language = language
+        return transcript
+
+    def set(self, video_id, segments, languages=None):
+        """Stores a Transcript (or raw segments) and evicts old entries if the cache is over its size cap."""
+        key = self._language_key(languages)
+        transcript = Transcript.from_segments(segments)
+        data = zlib.compress(transcript.to_bytes())
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (video_id, languages, data, size, created_at, accessed_at, language) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (video_id, key, data, len(data), now, now, transcript.language),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl:
+            self._conn.execute("DELETE FROM transcripts WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT video_id, languages, size FROM transcripts ORDER BY accessed_at ASC"
+        ).fetchall()
+        for video_id, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute(
+                "DELETE FROM transcripts WHERE video_id = ? AND languages = ?", (video_id, key)
+            )
+            total -= size
+
+    def clear(self):
+        """Removes every cached transcript."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transcripts")
+
+    def stats(self):
+        """Returns the number of cached entries and their total compressed size in bytes."""
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts"
+            ).fetchone()
+        return {"entries": count, "bytes": size}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Returns the process-wide transcript cache, creating it on first use."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = TranscriptCache()
+    return _default_cache
+
+
+def get_transcript(video_id, languages=None, cache=None):
+    """Returns the Transcript for a video in one of languages, hitting YouTube only on a cache miss."""
+    cache = cache or get_default_cache()
+    transcript = cache.get(video_id, languages)
+    if transcript is None:
+        # Same lookup as YouTubeTranscriptApi.get_transcript, but it tells which language was found
+        found = list_transcripts(video_id).find_transcript(languages or DEFAULT_LANGUAGES)
+        transcript = Transcript.from_segments(found.fetch(), found.language_code)
+        cache.set(video_id, transcript, languages)
+    return transcript
+
+
+_listings = OrderedDict()
+_listings_lock = threading.Lock()
+
+
+def list_transcripts(video_id):
+    """Returns the video's TranscriptList, reusing a listing fetched within LISTING_TTL seconds."""
+    now = time.time()
+    with _listings_lock:
+        entry = _listings.get(video_id)
+        if entry is not None and now - entry[1] <= LISTING_TTL:
+            _listings.move_to_end(video_id)
+            return entry[0]
+    listing = YouTubeTranscriptApi.list_transcripts(video_id)
+    with _listings_lock:
+        _listings[video_id] = (listing, now)
+        _listings.move_to_end(video_id)
+        while len(_listings) > LISTING_MAX_ENTRIES:
+            _listings.popitem(last=False)
+    return listing
+
+
+def find_preferred_transcript(listing, languages=None):
+    """Picks a transcript from a listing: manual before auto-generated, each in languages order.
+
+    Falls back to any manual transcript, then any auto-generated one, when
+    none is in a preferred language.
+    """
+    languages = languages or DEFAULT_LANGUAGES
+    try:
+        return listing.find_manually_created_transcript(languages)
+    except NoTranscriptFound:
+        pass
+    try:
+        return listing.find_generated_transcript(languages)
+    except NoTranscriptFound:
+        pass
+    # The listing iterates manual transcripts first
+    for transcript in listing:
+        return transcript
+    raise NoTranscriptFound(listing.video_id, languages, listing)
+
+
+def _preferred_key(languages):
+    # Preferred fetches may fall back to any language, so they must not share
+    # cache entries with strict get_transcript lookups for the same languages
+    return ("preferred:" + ",".join(languages or DEFAULT_LANGUAGES),)
+
+
+def get_preferred_transcript(video_id, languages=None, cache=None):
+    """Returns the Transcript in the most preferred available language, fetched from the shared listing."""
+    cache = cache or get_default_cache()
+    transcript = cache.get(video_id, _preferred_key(languages))
+    if transcript is None:
+        found = find_preferred_transcript(list_transcripts(video_id), languages)
+        transcript = Transcript.from_segments(found.fetch(), found.language_code)
+        cache.set(video_id, transcript, _preferred_key(languages))
+    return transcript
+
+
+def get_translations(video_id, targets, languages=None, cache=None, max_workers=TRANSLATION_WORKERS):
+    """Returns {language code: Transcript} with the preferred transcript translated into each target.
+
+    Translations missing from the cache are fetched in parallel. A target that
+    is the preferred transcript's own language is the cached preferred
+    transcript itself (see get_preferred_transcript), not a second copy.
+    """
+    cache = cache or get_default_cache()
+    base_languages = tuple(languages or DEFAULT_LANGUAGES)
+    preferred_transcript = cache.get(video_id, _preferred_key(base_languages))
+    results = {}
+    missing = []
+    for target in targets:
+        if preferred_transcript is not None and preferred_transcript.language == target:
+            results[target] = preferred_transcript
+            continue
+        transcript = cache.get(video_id, base_languages + (f"->{target}",))
+        if transcript is None:
+            missing.append(target)
+        else:
+            results[target] = transcript
+    if not missing:
+        return results
+
+    preferred = find_preferred_transcript(list_transcripts(video_id), base_languages)
+
+    def fetch(target):
+        if target == preferred.language_code:
+            return get_preferred_transcript(video_id, base_languages, cache)
+        transcript = Transcript.from_segments(preferred.translate(target).fetch(), target)
+        cache.set(video_id, transcript, base_languages + (f"->{target}",))
+        return transcript
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+        results.update(zip(missing, executor.map(fetch, missing)))
+    return results
@@ -0,0 +1,104 @@
+"""Deterministic transcript compaction run between fetch and prompt building.
+
+Auto-generated captions carry a lot of text that costs tokens without adding
+meaning: ``[Music]``-style markers, filler words, lines repeated verbatim and
+rolling captions whose start repeats the end of the previous line. Removing
+them shrinks every summary and question prompt built from the transcript.
+"""
+import re
+
+from chunked_summary import CHARS_PER_TOKEN
+
+NOISE_TAG_RE = re.compile(
+    r"\[(?:music|applause|laughter|laughs|cheering|inaudible|silence|noise|foreign|__)\]"
+    r"|\((?:music|applause|laughter|laughs|inaudible)\)"
+    r"|[♪♫]+",
+    re.IGNORECASE,
+)
+FILLER_RE = re.compile(r"\b(?:u+m+|u+h+|e+r+m+|hm+|mhm)\b[,.]?", re.IGNORECASE)
+WHITESPACE_RE = re.compile(r"\s+")
+SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]*$")
+
+MIN_OVERLAP_WORDS = 2
+
+
+def _strip_overlap(previous, current):
+    """Drops the leading words of current that repeat the trailing words of previous."""
+    previous_words = previous.split(" ")
+    current_words = current.split(" ")
+    longest = min(len(previous_words), len(current_words))
+    for size in range(longest, MIN_OVERLAP_WORDS - 1, -1):
+        if [w.lower() for w in previous_words[-size:]] == [w.lower() for w in current_words[:size]]:
+            return " ".join(current_words[size:])
+    return current
+
+
+def _merge_sentences(segments):
+    merged = []
+    pending = None
+    for segment in segments:
+        if pending is None:
+            pending = dict(segment)
+        else:
+            pending["text"] += " " + segment["text"]
+            if segment.get("start") is not None and pending.get("start") is not None:
+                pending["duration"] = segment["start"] + segment.get("duration", 0) - pending["start"]
+        if SENTENCE_END_RE.search(pending["text"]):
+            merged.append(pending)
+            pending = None
+    if pending is not None:
+        merged.append(pending)
+    return merged
+
+
+def compact_segments(segments, remove_noise=True, remove_fillers=True, deduplicate=True, merge_sentences=False):
+    """Compacts transcript segments and reports how much text was removed.
+
+    Segments keep their ``start``/``duration`` (a merged sentence spans all of
+    its segments); segments left empty are dropped. Returns the compacted
+    segments and a dict with ``chars_before``, ``chars_after``,
+    ``tokens_before``, ``tokens_after`` and the fractional ``reduction``.
+    """
+    chars_before = sum(len(segment["text"]) for segment in segments) + max(len(segments) - 1, 0)
+    compacted = []
+    previous = ""
+
+    for segment in segments:
+        text = segment["text"]
+        if remove_noise:
+            text = NOISE_TAG_RE.sub(" ", text)
+        if remove_fillers:
+            text = FILLER_RE.sub(" ", text)
+        text = WHITESPACE_RE.sub(" ", text).strip()
+        if not text:
+            continue
+        if deduplicate and previous:
+            # Compare against the whole previous line, not what was kept of it
+            if text.lower() == previous.lower():
+                continue
+            text, previous = _strip_overlap(previous, text), text
+            if not text:
+                continue
+        else:
+            previous = text
+        compacted.append({**segment, "text": text})
+
+    if merge_sentences:
+        compacted = _merge_sentences(compacted)
+
+    chars_after = sum(len(segment["text"]) for segment in compacted) + max(len(compacted) - 1, 0)
+    stats = {
+        "chars_before": chars_before,
+        "chars_after": chars_after,
+        "tokens_before": chars_before // CHARS_PER_TOKEN,
+        "tokens_after": chars_after // CHARS_PER_TOKEN,
+        "reduction": 1 - chars_after / chars_before if chars_before else 0.0,
+    }
+    return compacted, stats
+
+
+def format_stats(stats):
+    """Formats compaction stats as a one-line human readable report."""
+    return (f"Transcript compacted from {stats['chars_before']:,} to {stats['chars_after']:,} characters "
+            f"(~{stats['tokens_before']:,} to ~{stats['tokens_after']:,} tokens, "
+            f"-{stats['reduction']:.0%})")
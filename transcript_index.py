@@ -0,0 +1,106 @@
+"""BM25 retrieval index over timestamped transcript chunks.
+
+The index is built once when a transcript loads. Each question then sends
+only the few most relevant chunks to Gemini, labelled with their timestamps
+so the answer can cite them, instead of the whole transcript.
+"""
+import math
+import re
+import sys
+from collections import Counter
+
+from chunked_summary import format_time, split_segments
+
+DEFAULT_CHUNK_TOKENS = 300
+DEFAULT_OVERLAP_TOKENS = 40
+DEFAULT_TOP_K = 5
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Very common English words carry no signal for retrieval
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does for from has have how i in is it its "
+    "of on or so that the their there they this to was what when where which "
+    "who why will with you your".split()
+)
+
+
+def tokenize(text):
+    """Lowercases text and splits it into word tokens, dropping stopwords."""
+    return [word for word in _WORD_RE.findall(text.lower()) if word not in STOPWORDS]
+
+
+class TranscriptIndex:
+    """Okapi BM25 index over transcript chunks."""
+
+    def __init__(self, chunks, k1=1.5, b=0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._term_counts = [Counter(tokenize(chunk["text"])) for chunk in chunks]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0
+
+        document_frequency = Counter()
+        for counts in self._term_counts:
+            document_frequency.update(counts.keys())
+        total = len(chunks)
+        self._idf = {
+            term: math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the chunk texts, term counts and IDF table, in bytes."""
+        total = sys.getsizeof(self._idf) + sum(sys.getsizeof(term) for term in self._idf)
+        for chunk, counts in zip(self.chunks, self._term_counts):
+            total += sys.getsizeof(chunk) + sys.getsizeof(chunk["text"]) + sys.getsizeof(counts)
+            total += sum(sys.getsizeof(term) for term in counts)
+        return total
+
+    @classmethod
+    def from_segments(cls, segments, max_tokens=DEFAULT_CHUNK_TOKENS, overlap_tokens=DEFAULT_OVERLAP_TOKENS):
+        """Builds an index from a Transcript or transcript segments (dicts with text and optional start/duration)."""
+        return cls(split_segments(segments, max_tokens=max_tokens, overlap_tokens=overlap_tokens))
+
+    def search(self, query, top_k=DEFAULT_TOP_K):
+        """Returns up to top_k chunks ranked by relevance to query, in transcript order."""
+        return [self.chunks[index] for index in self._search_indices(query, top_k)]
+
+    def search_many(self, queries, top_k=DEFAULT_TOP_K):
+        """Returns the union of the top_k chunks for each query, in transcript order and without duplicates."""
+        indices = set()
+        for query in queries:
+            indices.update(self._search_indices(query, top_k))
+        return [self.chunks[index] for index in sorted(indices)]
+
+    def _search_indices(self, query, top_k):
+        terms = [term for term in tokenize(query) if term in self._idf]
+        if not terms:
+            return list(range(min(top_k, len(self.chunks))))
+
+        scores = []
+        for index, counts in enumerate(self._term_counts):
+            length_norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / (self._average_length or 1))
+            score = 0.0
+            for term in terms:
+                frequency = counts.get(term)
+                if frequency:
+                    score += self._idf[term] * frequency * (self.k1 + 1) / (frequency + length_norm)
+            if score > 0:
+                scores.append((score, index))
+
+        best = sorted(scores, reverse=True)[:top_k]
+        return sorted(index for _, index in best)
+
+
+def format_context(chunks):
+    """Formats retrieved chunks as timestamped excerpts for a prompt."""
+    excerpts = []
+    for chunk in chunks:
+        if chunk["start"] is not None:
+            excerpts.append(f"[{format_time(chunk['start'])}] {chunk['text']}")
+        else:
+            excerpts.append(chunk["text"])
+    return "\n\n".join(excerpts)
@@ -0,0 +1,139 @@
+"""Process-wide, deduplicated store for transcripts and other per-video data.
+
+Streamlit keeps ``st.session_state`` per browser session, so storing the
+transcript there holds one copy per viewer: memory grows with the number of
+sessions even when they all watch the same popular video. ``TranscriptStore``
+holds one copy per key for the whole process, and each session keeps only a
+small ``StoreRef`` naming the key.
+
+Entries are reference-counted by the refs pointing at them. When the total
+size passes ``max_bytes``, least recently used unreferenced entries are
+evicted first. If only referenced entries remain, the least recently used of
+those are dropped too, so the cap is a real bound. A ref whose entry was
+evicted reloads it from its loader (for transcripts, the on-disk transcript
+cache) the next time it is read. A ref is released explicitly or when the
+session holding it is garbage-collected. Derived data shared without a session
+ref, such as retrieval indexes, is read with ``get`` and counts towards the
+same cap as an unreferenced entry.
+"""
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = int(os.getenv("TRANSCRIPT_STORE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+def _nbytes(value):
+    nbytes = getattr(value, "nbytes", None)
+    return nbytes if nbytes is not None else sys.getsizeof(value)
+
+
+class StoreRef:
+    """A session's handle on one store entry; holds the key, not the value."""
+
+    def __init__(self, store, key, loader):
+        self.key = key
+        self._store = store
+        self._loader = loader
+        self._finalizer = weakref.finalize(self, store._release, key)
+
+    def get(self):
+        """Returns the entry's value, reloading it if it was evicted (None if reloading fails)."""
+        return self._store.get(self.key, self._loader)
+
+    def release(self):
+        """Drops this reference; the entry becomes evictable once no refs remain."""
+        self._finalizer()
+
+
+class TranscriptStore:
+    """Shared values keyed by video, bounded by total size and reference-counted by session refs."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes), least recently used first
+        self._refs = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def ref(self, key, loader, value=None, replace=False):
+        """Returns a new StoreRef to key. loader() builds the value when it is missing.
+
+        A value passed in is stored unless the key is already present, in
+        which case the existing copy is shared and the new one dropped. With
+        ``replace=True`` it overwrites the existing copy instead.
+        """
+        with self._lock:
+            self._refs[key] = self._refs.get(key, 0) + 1
+            if replace and key in self._entries:
+                _, nbytes = self._entries.pop(key)
+                self._bytes -= nbytes
+        if value is not None:
+            self._put(key, value)
+        return StoreRef(self, key, loader)
+
+    def get(self, key, loader):
+        """Returns key's value, loading it with loader() if missing (None if loading fails). Takes no ref."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.loads += 1
+        # Load outside the lock; if two sessions race, _put keeps the first copy
+        value = loader()
+        return self._put(key, value) if value is not None else None
+
+    def _put(self, key, value):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0]
+            nbytes = _nbytes(value)
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            self._evict(keep=key)
+            return value
+
+    def _evict(self, keep):
+        if self._bytes <= self.max_bytes:
+            return
+        # Unreferenced entries go first, then referenced ones, oldest first
+        for referenced in (False, True):
+            for key in list(self._entries):
+                if self._bytes <= self.max_bytes:
+                    return
+                if key == keep or (self._refs.get(key, 0) > 0) != referenced:
+                    continue
+                _, nbytes = self._entries.pop(key)
+                self._bytes -= nbytes
+                self.evictions += 1
+
+    def _release(self, key):
+        with self._lock:
+            count = self._refs.get(key, 0) - 1
+            if count > 0:
+                self._refs[key] = count
+            else:
+                self._refs.pop(key, None)
+
+    def stats(self):
+        """Returns the entry count, bytes held, the cap, live session refs and hit/load/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "referenced_entries": sum(1 for key in self._entries if self._refs.get(key)),
+                "refs": sum(self._refs.values()),
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }